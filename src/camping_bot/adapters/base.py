@@ -1,13 +1,38 @@
 ﻿from __future__ import annotations
 
+import asyncio
+import copy
+import logging
 from abc import ABC, abstractmethod
+from typing import Any, Awaitable, Callable
 
+import httpx
 from playwright.async_api import Page
+from playwright.async_api import TimeoutError as PlaywrightTimeoutError
 
-from camping_bot.models import RuntimeConfig, SlotResult
+from camping_bot.adapters.selector_resolver import SelectorMemory
+from camping_bot.deadline import clamp_ms
+from camping_bot.debug_artifacts import ArtifactStore
+from camping_bot.models import JobPlan, RuntimeConfig, SlotResult, Stay
+from camping_bot.plan import compile_plan
+
+logger = logging.getLogger(__name__)
 
 
 class SiteAdapter(ABC):
+    # criteria keys that change what search_slots() returns; jobs that agree on
+    # these (plus adapter/base_url/username) share one search per tick
+    search_criteria_keys: tuple[str, ...] = ("check_in", "nights", "guests")
+    # per-step wait budgets in ms; criteria.latency_budget_ms overrides individual steps
+    default_step_budgets_ms: dict[str, int] = {}
+    # adapter-specific criteria keys and their types, on top of plan.COMMON_CRITERIA_SCHEMA
+    criteria_schema: dict[str, type | tuple[type, ...]] = {}
+    # selector roles accepted in criteria.selectors (empty: any) and the ones a job must set
+    selector_roles: tuple[str, ...] = ()
+    required_selectors: tuple[str, ...] = ()
+    # roles read inside the page with querySelector: plain CSS, optionally ending in :has-text()
+    in_page_selector_roles: tuple[str, ...] = ()
+
     def __init__(
         self,
         page: Page,
@@ -15,17 +40,163 @@ class SiteAdapter(ABC):
         credentials: dict[str, str],
         criteria: dict,
         runtime: RuntimeConfig,
+        plan: JobPlan | None = None,
     ) -> None:
         self.page = page
         self.base_url = base_url
         self.credentials = credentials
         self.criteria = criteria
         self.runtime = runtime
+        self.plan = plan or compile_plan(criteria, type(self))
+        # winning fallback selectors from earlier runs; the runner injects a per-job instance
+        self.selector_memory = SelectorMemory()
+        # steps whose condition-based wait ran out of budget during the current run
+        self.budget_hits: list[str] = []
+        # debug capture sink and the job name it files captures under; injected by the runner
+        self.artifacts: ArtifactStore | None = None
+        self.job_name = ""
+        # extra tabs of this context used for multi-stay searches, and which stay each one shows
+        self._tabs: list[Page] = []
+        self._stay_pages: dict[Stay, Page] = {}
 
     @abstractmethod
     async def login(self) -> None:
         raise NotImplementedError
 
+    def step_budget_ms(self, step: str) -> int:
+        return clamp_ms(self.plan.step_budgets_ms.get(step, self.runtime.timeout_ms))
+
+    async def wait_step(self, step: str, wait: Callable[[int], Awaitable[Any]]) -> bool:
+        """Run a condition-based wait within the step's budget; record it if the budget runs out."""
+        try:
+            await wait(self.step_budget_ms(step))
+        except PlaywrightTimeoutError:
+            self.budget_hits.append(step)
+            return False
+        return True
+
+    async def capture_debug(self, tag: str) -> None:
+        """Hand a screenshot and the page HTML to the background artifact writer.
+
+        Skipped when no store is configured or the job captured something recently.
+        """
+        if self.artifacts is None or not self.artifacts.allow(self.job_name):
+            return
+        try:
+            screenshot = await self.page.screenshot(full_page=True)
+            html = (await self.page.content()).encode("utf-8")
+        except Exception:
+            logger.debug("debug capture failed", exc_info=True)
+            return
+        self.artifacts.submit(self.artifacts.path_for(self.job_name, tag, ".png"), screenshot)
+        self.artifacts.submit(self.artifacts.path_for(self.job_name, tag, ".html"), html)
+
+    @classmethod
+    async def probe_availability(
+        cls,
+        client: httpx.AsyncClient,
+        base_url: str,
+        plan: JobPlan,
+    ) -> bool | None:
+        """Browserless availability check over plain HTTP.
+
+        Return False to skip the browser run, True to escalate to it, or None
+        when the adapter has no probe for this job or the probe itself failed.
+        """
+        _ = (client, base_url, plan)
+        return None
+
+    async def is_logged_in(self) -> bool:
+        """Cheap check used by warm sessions to decide whether login() can be skipped."""
+        return False
+
+    async def prepare_for_opening(self) -> None:
+        """Park the logged-in page where search_slots() starts, ahead of an opening time."""
+        await self.page.goto(self.base_url, wait_until="domcontentloaded")
+
+    def for_stay(self, stay: Stay, page: Page | None = None) -> SiteAdapter:
+        """Shallow copy bound to `page` whose criteria name exactly one check_in/nights."""
+        view = copy.copy(self)
+        view.page = page or self.page
+        view.criteria = {**self.criteria, "nights": stay.nights}
+        if stay.check_in is not None:
+            view.criteria["check_in"] = stay.check_in
+        view.plan = self.plan.for_stay(stay)
+        view._tabs = []
+        view._stay_pages = {}
+        return view
+
+    async def search_stays(
+        self, search: Callable[[SiteAdapter], Awaitable[list[SlotResult]]]
+    ) -> list[SlotResult]:
+        """Run `search` once per check_in/nights option and merge the results.
+
+        Single-stay criteria run on this adapter as before. Otherwise the
+        options are spread over up to criteria.max_parallel_searches tabs of
+        the same logged-in context, each starting from base_url; results keep
+        the option order, which is the ranking _pick_slot falls back on.
+        """
+        if not self.plan.multi_stay:
+            return await search(self)
+
+        stays = self.plan.stays
+        width = min(len(stays), self.plan.max_parallel_searches)
+        self._tabs = [tab for tab in self._tabs if not tab.is_closed()]
+        while len(self._tabs) < width - 1:
+            self._tabs.append(await self.page.context.new_page())
+        self._stay_pages = {}
+
+        idle: asyncio.Queue[Page] = asyncio.Queue()
+        for tab in [self.page, *self._tabs[: width - 1]]:
+            idle.put_nowait(tab)
+
+        async def search_one(stay: Stay) -> list[SlotResult]:
+            tab = await idle.get()
+            try:
+                for stale in [key for key, shown in self._stay_pages.items() if shown is tab]:
+                    del self._stay_pages[stale]
+                if tab.url != self.base_url:
+                    await tab.goto(self.base_url, wait_until="domcontentloaded")
+                found = await search(self.for_stay(stay, tab))
+                self._stay_pages[stay] = tab
+                return found
+            finally:
+                idle.put_nowait(tab)
+
+        results = await asyncio.gather(*(search_one(stay) for stay in stays), return_exceptions=True)
+        merged: dict[str, SlotResult] = {}
+        errors = []
+        for stay, result in zip(stays, results):
+            if isinstance(result, asyncio.CancelledError):
+                raise result
+            if isinstance(result, BaseException):
+                logger.warning("일정 조회 실패(%s, %d박): %s", stay.check_in, stay.nights, result)
+                errors.append(result)
+                continue
+            for slot in result:
+                merged.setdefault(slot.slot_id, slot)
+        if errors and len(errors) == len(stays):
+            raise errors[0]
+        return list(merged.values())
+
+    async def stay_view(self, slot: SlotResult) -> SiteAdapter | None:
+        """Adapter on the tab showing `slot`'s stay after search_stays(); None for single-stay jobs.
+
+        If that tab has since moved on to another stay, the stay is searched
+        again on the main page so booking never acts on the wrong date.
+        """
+        if not self.plan.multi_stay:
+            return None
+        stay = Stay(slot.check_in, slot.nights)
+        tab = self._stay_pages.get(stay)
+        if tab is not None and not tab.is_closed():
+            return self.for_stay(stay, tab)
+        if self.page.url != self.base_url:
+            await self.page.goto(self.base_url, wait_until="domcontentloaded")
+        view = self.for_stay(stay, self.page)
+        await view.search_slots()
+        return view
+
     @abstractmethod
     async def search_slots(self) -> list[SlotResult]:
         raise NotImplementedError
@@ -1,13 +1,20 @@
 ﻿from __future__ import annotations
 
 import asyncio
+import logging
+import re
 from datetime import datetime
-from pathlib import Path
-from typing import Any
+from typing import Any, Sequence
+
+import httpx
 
 from camping_bot.adapters.base import SiteAdapter
+from camping_bot.adapters.selector_resolver import SelectorResolver, split_has_text
 from camping_bot.captcha import get_captcha_solver
-from camping_bot.models import SlotResult
+from camping_bot.metrics import timed
+from camping_bot.models import JobPlan, SlotResult
+
+logger = logging.getLogger(__name__)
 
 
 class InterparkAnseongAdapter(SiteAdapter):
@@ -16,117 +23,252 @@ class InterparkAnseongAdapter(SiteAdapter):
     Selectors vary over time; pass site-specific selectors via criteria.selectors.
     """
 
+    search_criteria_keys = (
+        "check_in",
+        "nights",
+        "guests",
+        "preferred_zone",
+        "selectors",
+    )
+    default_step_budgets_ms = {
+        "popup_close": 1000,
+        "login_form": 15000,
+        "login_form_retry": 10000,
+        "login_submit": 5000,
+        "booking_page": 5000,
+    }
+    criteria_schema = {
+        "preferred_zone": str,
+        "selectors": dict,
+        "login_url": str,
+        "manual_login_fallback": bool,
+        "captcha_mode": str,
+        "discount_value": (str, int),
+        "bank_code": (str, int),
+        "personal_info": dict,
+        "probe": dict,
+    }
+    selector_roles = (
+        "login_button",
+        "username_input",
+        "password_input",
+        "submit_login_button",
+        "logged_in_indicator",
+        "popup_close_buttons",
+        "check_in_input",
+        "nights_select",
+        "guests_select",
+        "search_button",
+        "booking_page_button",
+        "anti_bot_input",
+        "anti_bot_submit",
+        "site_item",
+        "site_name",
+        "site_zone",
+        "site_capacity",
+        "site_available",
+        "site_select_button",
+        "discount_select",
+        "birth_input",
+        "car_number_input",
+        "bank_transfer_radio",
+        "bank_select",
+        "agree_checkboxes",
+        "submit_reservation_button",
+    )
+    required_selectors = ("site_item", "site_select_button", "submit_reservation_button")
+    # read per row in one evaluate_all by _scan_deck_rows
+    in_page_selector_roles = (
+        "site_name",
+        "site_zone",
+        "site_capacity",
+        "site_available",
+        "site_select_button",
+    )
+
     async def login(self) -> None:
         await self.page.goto(self.base_url, wait_until="domcontentloaded")
         await self._close_optional_popups()
 
-        selectors = self._selectors()
-        login_buttons = self._as_list(selectors.get("login_button"))
+        plan = self.plan
+        login_buttons = plan.selector_list("login_button")
         if login_buttons:
-            await self._click_first_existing(self.page, login_buttons)
-            await self.page.wait_for_timeout(600)
+            await self._click_first_existing(self.page, "login_button", login_buttons)
 
         username = self.credentials.get("username")
         password = self.credentials.get("password")
         if not username or not password:
             raise ValueError("Missing credentials.username or credentials.password")
 
-        user_selectors = self._as_list(selectors.get("username_input"))
-        pass_selectors = self._as_list(selectors.get("password_input"))
-        submit_selectors = self._as_list(selectors.get("submit_login_button"))
+        user_selectors = plan.selector_list("username_input")
+        pass_selectors = plan.selector_list("password_input")
+        submit_selectors = plan.selector_list("submit_login_button")
         if not (user_selectors and pass_selectors and submit_selectors):
             await self._manual_login_if_enabled("Missing login selectors in criteria.selectors")
             return
 
-        login_ctx = await self._find_context_with_any_selector(user_selectors, timeout_ms=15000)
+        login_ctx = await self._find_context_with_any_selector(
+            "username_input", user_selectors, timeout_ms=self.step_budget_ms("login_form")
+        )
         if login_ctx is None:
-            login_url = str(self.criteria.get("login_url", "")).strip()
+            self.budget_hits.append("login_form")
+            login_url = str(plan.criteria.get("login_url", "")).strip()
             if login_url:
                 await self.page.goto(login_url, wait_until="domcontentloaded")
                 login_ctx = await self._find_context_with_any_selector(
-                    user_selectors, timeout_ms=10000
+                    "username_input",
+                    user_selectors,
+                    timeout_ms=self.step_budget_ms("login_form_retry"),
                 )
+                if login_ctx is None:
+                    self.budget_hits.append("login_form_retry")
 
         if login_ctx is None:
-            await self._dump_debug("login_not_found")
+            await self.capture_debug("login_not_found")
             await self._manual_login_if_enabled(
                 "Login username input not found: " + " | ".join(user_selectors)
             )
             return
 
-        if not await self._fill_first_existing(login_ctx, user_selectors, username):
-            await self._dump_debug("login_user_fill_failed")
+        if not await self._fill_first_existing(login_ctx, "username_input", user_selectors, username):
+            await self.capture_debug("login_user_fill_failed")
             await self._manual_login_if_enabled("Failed to fill username input")
             return
 
-        if not await self._fill_first_existing(login_ctx, pass_selectors, password):
-            await self._dump_debug("login_pass_fill_failed")
+        if not await self._fill_first_existing(login_ctx, "password_input", pass_selectors, password):
+            await self.capture_debug("login_pass_fill_failed")
             await self._manual_login_if_enabled("Failed to fill password input")
             return
 
-        if not await self._click_first_existing(login_ctx, submit_selectors):
-            await self._dump_debug("login_submit_failed")
+        if not await self._click_first_existing(login_ctx, "submit_login_button", submit_selectors):
+            await self.capture_debug("login_submit_failed")
             await self._manual_login_if_enabled("Failed to click submit login button")
             return
 
-        await self.page.wait_for_timeout(1000)
+        await self._wait_login_complete()
+
+    @classmethod
+    async def probe_availability(
+        cls,
+        client: httpx.AsyncClient,
+        base_url: str,
+        plan: JobPlan,
+    ) -> bool | None:
+        probe = plan.criteria.get("probe")
+        if not isinstance(probe, dict) or not probe.get("url"):
+            return None
+
+        pattern = str(probe.get("available_pattern", "")).strip()
+        if not pattern:
+            return None
+
+        async def probe_stay(check_in: str | None, nights: int) -> bool:
+            url = str(probe["url"]).format(
+                base_url=base_url,
+                check_in=check_in or "",
+                nights=nights,
+                guests=plan.guests,
+            )
+            response = await client.get(url)
+            response.raise_for_status()
+            return re.search(pattern, response.text) is not None
+
+        try:
+            results = await asyncio.gather(
+                *(probe_stay(stay.check_in, stay.nights) for stay in plan.stays)
+            )
+        except httpx.HTTPError as exc:
+            # a blocked or failing probe endpoint must not stop monitoring; let the browser decide
+            logger.warning("HTTP 프로브 실패, 브라우저로 조회: %s", exc)
+            return None
+        return any(results)
+
+    async def is_logged_in(self) -> bool:
+        indicators = self.plan.selector_list("logged_in_indicator")
+        if not indicators:
+            return False
+
+        if self.page.url != self.base_url:
+            await self.page.goto(self.base_url, wait_until="domcontentloaded")
+        for selector in indicators:
+            try:
+                if await self.page.locator(selector).count() > 0:
+                    return True
+            except Exception:
+                continue
+        return False
+
+    async def prepare_for_opening(self) -> None:
+        if self.page.url != self.base_url:
+            await self.page.goto(self.base_url, wait_until="domcontentloaded")
+        await self._close_optional_popups()
 
     async def search_slots(self) -> list[SlotResult]:
+        return await self.search_stays(lambda view: view._search_one_stay())
+
+    async def _search_one_stay(self) -> list[SlotResult]:
         await self._close_optional_popups()
         await self._apply_schedule_filters()
         await self._move_to_booking_page()
         await self._handle_anti_bot_text()
         await self._close_optional_popups()
 
-        chosen_site_name = await self._select_deck_site()
-        if not chosen_site_name:
-            return []
-
-        nights = int(self.criteria.get("nights", 1))
-        guests = int(self.criteria.get("guests", 1))
-        check_in = self.criteria.get("check_in", datetime.now().strftime("%Y-%m-%d"))
-
-        return [
-            SlotResult(
-                slot_id=f"interpark-{check_in}-{chosen_site_name}",
-                zone=self.criteria.get("preferred_zone", "DECK"),
-                site_name=chosen_site_name,
-                check_in=check_in,
-                nights=nights,
-                capacity=max(guests, 1),
-            )
-        ]
+        return self._rows_to_slots(await self._scan_deck_rows())
 
     async def book_slot(self, slot: SlotResult) -> bool:
-        _ = slot
+        view = await self.stay_view(slot)
+        if view is not None:
+            await view.page.bring_to_front()
+            return await view.book_slot(slot)
+        if not await self._click_deck_site(slot.site_name):
+            return False
         await self._select_discount()
         await self._fill_personal_info()
         await self._select_payment_bank_transfer()
         await self._agree_and_submit()
         return True
 
+    @timed
     async def _close_optional_popups(self) -> None:
-        selectors = self._selectors()
-        close_buttons = self._as_list(selectors.get("popup_close_buttons"))
+        close_buttons = self.plan.selector_list("popup_close_buttons")
+        budget = self.step_budget_ms("popup_close")
         for close_selector in close_buttons:
             try:
-                loc = self.page.locator(close_selector)
-                if await loc.count() > 0:
-                    await loc.first.click(timeout=1000)
-                    await self.page.wait_for_timeout(150)
+                loc = self.page.locator(close_selector).first
+                if not await loc.is_visible():
+                    continue
+                await loc.click(timeout=budget)
+                await self.wait_step(
+                    "popup_close", lambda timeout: loc.wait_for(state="hidden", timeout=timeout)
+                )
             except Exception:
                 continue
 
+    @timed
+    async def _wait_login_complete(self) -> None:
+        indicators = self.plan.selector_list("logged_in_indicator")
+        if indicators:
+            marker = self._any_of(self.page, indicators)
+            await self.wait_step(
+                "login_submit", lambda timeout: marker.wait_for(state="attached", timeout=timeout)
+            )
+            return
+        await self.wait_step(
+            "login_submit",
+            lambda timeout: self.page.wait_for_load_state("networkidle", timeout=timeout),
+        )
+
+    @timed
     async def _apply_schedule_filters(self) -> None:
-        selectors = self._selectors()
-        check_in = self.criteria.get("check_in")
-        nights = self.criteria.get("nights")
-        guests = self.criteria.get("guests")
+        plan = self.plan
+        check_in = plan.stay.check_in
+        nights = plan.stay.nights
+        guests = plan.criteria.get("guests")
 
-        check_in_input = selectors.get("check_in_input")
-        nights_select = selectors.get("nights_select")
-        guests_select = selectors.get("guests_select")
-        search_button = selectors.get("search_button")
+        check_in_input = plan.selector("check_in_input")
+        nights_select = plan.selector("nights_select")
+        guests_select = plan.selector("guests_select")
+        search_button = plan.selector("search_button")
 
         if check_in and check_in_input:
             await self.page.locator(check_in_input).fill(str(check_in))
@@ -137,25 +279,44 @@ class InterparkAnseongAdapter(SiteAdapter):
         if search_button:
             await self.page.locator(search_button).click()
 
+    @timed
     async def _move_to_booking_page(self) -> None:
-        selectors = self._selectors()
-        booking_button = selectors.get("booking_page_button")
+        plan = self.plan
+        booking_button = plan.selector("booking_page_button")
         if not booking_button:
             return
         await self.page.locator(booking_button).click()
-        await self.page.wait_for_timeout(500)
 
+        markers = [
+            marker
+            for marker in (plan.selector("anti_bot_input"), plan.selector("site_item"))
+            if marker
+        ]
+        if markers:
+            ready = self._any_of(self.page, markers)
+            await self.wait_step(
+                "booking_page", lambda timeout: ready.wait_for(state="visible", timeout=timeout)
+            )
+        else:
+            await self.wait_step(
+                "booking_page",
+                lambda timeout: self.page.wait_for_load_state("domcontentloaded", timeout=timeout),
+            )
+
+    @timed
     async def _handle_anti_bot_text(self) -> None:
-        selectors = self._selectors()
-        anti_bot_input = selectors.get("anti_bot_input")
-        anti_bot_submit = selectors.get("anti_bot_submit")
+        anti_bot_input = self.plan.selector("anti_bot_input")
+        anti_bot_submit = self.plan.selector("anti_bot_submit")
 
         if not anti_bot_input:
             return
 
-        solver_mode = str(self.criteria.get("captcha_mode", self.runtime.captcha_mode))
+        solver_mode = str(self.plan.criteria.get("captcha_mode", self.runtime.captcha_mode))
         solver = get_captcha_solver(solver_mode)
-        code = await solver.solve("[ANTI-BOT] 화면의 문자를 입력하세요: ")
+        stay = self.plan.stay
+        code = await solver.solve(
+            f"[ANTI-BOT][{self.job_name} {stay.check_in or '-'} {stay.nights}박] 화면의 문자를 입력하세요: "
+        )
         if not code:
             raise ValueError("Captcha code is empty")
 
@@ -163,134 +324,141 @@ class InterparkAnseongAdapter(SiteAdapter):
         if anti_bot_submit:
             await self.page.locator(anti_bot_submit).click()
 
-    async def _select_deck_site(self) -> str | None:
-        selectors = self._selectors()
-        preferred = self.criteria.get("preferred_sites", [])
-        item_selector = selectors.get("site_item")
-        name_selector = selectors.get("site_name")
-        click_selector = selectors.get("site_select_button")
-
-        if not (item_selector and click_selector):
-            raise ValueError("Missing site selectors in criteria.selectors")
-
-        items = self.page.locator(item_selector)
-        count = await items.count()
-        for idx in range(count):
-            row = items.nth(idx)
-            name = ""
-            if name_selector:
-                child = row.locator(name_selector)
-                if await child.count() > 0:
-                    name = (await child.first.inner_text()).strip()
-            if preferred and name and name not in preferred:
+    @timed
+    async def _scan_deck_rows(self) -> list[dict[str, Any]]:
+        """Read every deck row (name, zone, capacity, availability) in one in-page evaluation."""
+        plan = self.plan
+        return await self.page.locator(plan.selector("site_item")).evaluate_all(
+            _SCAN_ROWS_JS,
+            {
+                "name": _in_page(plan.selector("site_name")),
+                "zone": _in_page(plan.selector("site_zone")),
+                "capacity": _in_page(plan.selector("site_capacity")),
+                "available": _in_page(plan.selector("site_available")),
+                "button": _in_page(plan.selector("site_select_button")),
+            },
+        )
+
+    def _rows_to_slots(self, rows: list[dict[str, Any]]) -> list[SlotResult]:
+        plan = self.plan
+        nights = plan.stay.nights
+        guests = plan.guests
+        check_in = plan.stay.check_in or datetime.now().strftime("%Y-%m-%d")
+        default_zone = plan.criteria.get("preferred_zone", "DECK")
+
+        slots = []
+        for row in rows:
+            if not row.get("available"):
                 continue
-            await row.locator(click_selector).first.click()
-            return name or f"site-{idx + 1}"
-
-        return None
+            name = row.get("name") or f"site-{row['index'] + 1}"
+            capacity = re.search(r"\d+", row.get("capacity") or "")
+            slots.append(
+                SlotResult(
+                    slot_id=f"interpark-{check_in}-{nights}-{name}",
+                    zone=row.get("zone") or default_zone,
+                    site_name=name,
+                    check_in=check_in,
+                    nights=nights,
+                    capacity=int(capacity.group()) if capacity else max(guests, 1),
+                )
+            )
+        return slots
+
+    @timed
+    async def _click_deck_site(self, site_name: str) -> bool:
+        rows = await self._scan_deck_rows()
+        for row in rows:
+            name = row.get("name") or f"site-{row['index'] + 1}"
+            if name == site_name and row.get("available"):
+                row_loc = self.page.locator(self.plan.selector("site_item")).nth(row["index"])
+                await row_loc.locator(self.plan.selector("site_select_button")).first.click()
+                return True
+        return False
 
+    @timed
     async def _select_discount(self) -> None:
-        selectors = self._selectors()
-        discount = self.criteria.get("discount_value")
-        discount_select = selectors.get("discount_select")
+        discount = self.plan.criteria.get("discount_value")
+        discount_select = self.plan.selector("discount_select")
         if discount and discount_select:
             await self.page.locator(discount_select).select_option(str(discount))
 
+    @timed
     async def _fill_personal_info(self) -> None:
-        selectors = self._selectors()
-        personal = self.criteria.get("personal_info", {})
+        personal = self.plan.criteria.get("personal_info") or {}
 
-        birth_input = selectors.get("birth_input")
-        car_input = selectors.get("car_number_input")
+        birth_input = self.plan.selector("birth_input")
+        car_input = self.plan.selector("car_number_input")
 
         if birth_input and personal.get("birth"):
             await self.page.locator(birth_input).fill(str(personal["birth"]))
         if car_input and personal.get("car_number"):
             await self.page.locator(car_input).fill(str(personal["car_number"]))
 
+    @timed
     async def _select_payment_bank_transfer(self) -> None:
-        selectors = self._selectors()
-        bank_transfer_radio = selectors.get("bank_transfer_radio")
-        bank_select = selectors.get("bank_select")
-        bank_value = self.criteria.get("bank_code")
+        bank_transfer_radio = self.plan.selector("bank_transfer_radio")
+        bank_select = self.plan.selector("bank_select")
+        bank_value = self.plan.criteria.get("bank_code")
 
         if bank_transfer_radio:
             await self.page.locator(bank_transfer_radio).click()
         if bank_select and bank_value:
             await self.page.locator(bank_select).select_option(str(bank_value))
 
+    @timed
     async def _agree_and_submit(self) -> None:
-        selectors = self._selectors()
-        for agree_selector in self._as_list(selectors.get("agree_checkboxes")):
+        for agree_selector in self.plan.selector_list("agree_checkboxes"):
             box = self.page.locator(agree_selector)
             if await box.count() > 0:
                 await box.first.check()
 
-        submit_selector = selectors.get("submit_reservation_button")
-        if not submit_selector:
-            raise ValueError("Missing submit_reservation_button selector")
-        await self.page.locator(submit_selector).click()
+        await self.page.locator(self.plan.selector("submit_reservation_button")).click()
 
+    @timed
     async def _find_context_with_any_selector(
         self,
-        selector_candidates: list[str],
+        role: str,
+        selector_candidates: tuple[str, ...],
         timeout_ms: int,
     ) -> Any | None:
+        resolver = SelectorResolver(self.selector_memory)
         deadline = asyncio.get_running_loop().time() + (timeout_ms / 1000)
         while asyncio.get_running_loop().time() < deadline:
-            pages = list(self.page.context.pages)
-            for page in pages:
-                for ctx in [page, *page.frames]:
-                    for selector in selector_candidates:
-                        try:
-                            if await ctx.locator(selector).count() > 0:
-                                return ctx
-                        except Exception:
-                            continue
+            contexts = [ctx for page in self.page.context.pages for ctx in [page, *page.frames]]
+            found = await resolver.resolve(role, contexts, selector_candidates)
+            if found:
+                return found[0]
             await asyncio.sleep(0.2)
         return None
 
-    async def _fill_first_existing(self, ctx: Any, selectors: list[str], value: str) -> bool:
-        for selector in selectors:
-            try:
-                loc = ctx.locator(selector)
-                if await loc.count() > 0:
-                    await loc.first.fill(value)
-                    return True
-            except Exception:
-                continue
-        return False
-
-    async def _click_first_existing(self, ctx: Any, selectors: list[str]) -> bool:
-        for selector in selectors:
-            try:
-                loc = ctx.locator(selector)
-                if await loc.count() > 0:
-                    await loc.first.click()
-                    return True
-            except Exception:
-                continue
-        return False
-
-    async def _dump_debug(self, tag: str) -> None:
-        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-        root = Path("logs")
-        root.mkdir(parents=True, exist_ok=True)
-        screenshot = root / f"{tag}_{stamp}.png"
-        html = root / f"{tag}_{stamp}.html"
-
+    async def _fill_first_existing(
+        self, ctx: Any, role: str, selectors: tuple[str, ...], value: str
+    ) -> bool:
+        found = await SelectorResolver(self.selector_memory).resolve(role, [ctx], selectors)
+        if not found:
+            return False
         try:
-            await self.page.screenshot(path=str(screenshot), full_page=True)
+            await ctx.locator(found[1]).first.fill(value)
         except Exception:
-            pass
+            self.selector_memory.forget(role)
+            return False
+        return True
 
+    async def _click_first_existing(
+        self, ctx: Any, role: str, selectors: tuple[str, ...]
+    ) -> bool:
+        found = await SelectorResolver(self.selector_memory).resolve(role, [ctx], selectors)
+        if not found:
+            return False
         try:
-            html.write_text(await self.page.content(), encoding="utf-8")
+            await ctx.locator(found[1]).first.click()
         except Exception:
-            pass
+            self.selector_memory.forget(role)
+            return False
+        return True
 
     async def _manual_login_if_enabled(self, message: str) -> None:
-        if not bool(self.criteria.get("manual_login_fallback", False)):
+        if not bool(self.plan.criteria.get("manual_login_fallback", False)):
             raise ValueError(message)
         if self.runtime.headless:
             raise ValueError(
@@ -301,17 +469,46 @@ class InterparkAnseongAdapter(SiteAdapter):
         await asyncio.to_thread(input, "")
         await self.page.wait_for_timeout(500)
 
-    def _as_list(self, value: Any) -> list[str]:
-        if value is None:
-            return []
-        if isinstance(value, str):
-            return [value]
-        if isinstance(value, list):
-            return [str(item) for item in value if item]
-        return [str(value)]
-
-    def _selectors(self) -> dict:
-        selectors = self.criteria.get("selectors", {})
-        if not isinstance(selectors, dict):
-            return {}
-        return selectors
+    def _any_of(self, ctx: Any, selectors: Sequence[str]) -> Any:
+        loc = ctx.locator(selectors[0])
+        for selector in selectors[1:]:
+            loc = loc.or_(ctx.locator(selector))
+        return loc.first
+
+
+
+# selectors arrive as {css, text} (see _in_page); compile_plan guarantees the CSS part is
+# valid for querySelectorAll, so a failing query here is a real page mismatch
+_SCAN_ROWS_JS = """
+(rows, cfg) => rows.map((row, index) => {
+  const find = (sel, fallbackCss, accept) => {
+    if (!sel) return null;
+    for (const el of row.querySelectorAll(sel.css || fallbackCss)) {
+      const label = el.textContent || el.value || "";
+      if ((sel.text === null || label.includes(sel.text)) && (!accept || accept(el))) return el;
+    }
+    return null;
+  };
+  const text = (sel) => {
+    const el = find(sel, "*");
+    return el ? el.textContent.trim() : "";
+  };
+  const available = cfg.available
+    ? !!find(cfg.available, "*")
+    : !!find(cfg.button, "button, a, input", (el) => !el.disabled);
+  return {
+    index,
+    name: text(cfg.name),
+    zone: text(cfg.zone),
+    capacity: text(cfg.capacity),
+    available,
+  };
+})
+"""
+
+
+def _in_page(selector: str | None) -> dict[str, str | None] | None:
+    if not selector:
+        return None
+    css, text = split_has_text(selector)
+    return {"css": css, "text": text}
@@ -11,10 +11,16 @@ class MockAdapter(SiteAdapter):
         # 실제 사이트에서는 로그인 페이지 이동/입력/제출 처리
         await self.page.goto("https://example.com")
 
+    async def is_logged_in(self) -> bool:
+        return self.page.url.startswith("https://example.com")
+
     async def search_slots(self) -> list[SlotResult]:
-        check_in = self.criteria.get("check_in", "2026-01-01")
-        nights = int(self.criteria.get("nights", 1))
-        guests = int(self.criteria.get("guests", 2))
+        return await self.search_stays(lambda view: view._search_one_stay())
+
+    async def _search_one_stay(self) -> list[SlotResult]:
+        check_in = self.plan.stay.check_in or "2026-01-01"
+        nights = self.plan.stay.nights
+        guests = int(self.plan.criteria.get("guests", 2))
 
         # 분 단위로 가용성 변화를 흉내내는 샘플 데이터
         minute = datetime.utcnow().minute
@@ -25,7 +31,7 @@ class MockAdapter(SiteAdapter):
 
         return [
             SlotResult(
-                slot_id=f"mock-{minute}",
+                slot_id=f"mock-{check_in}-{nights}-{minute}",
                 zone="A",
                 site_name="Mock Camp A-12",
                 check_in=check_in,
@@ -33,7 +39,7 @@ class MockAdapter(SiteAdapter):
                 capacity=max(guests, 4),
             ),
             SlotResult(
-                slot_id=f"mock-{minute}-b",
+                slot_id=f"mock-{check_in}-{nights}-{minute}-b",
                 zone="RIVER",
                 site_name="Mock Camp River-2",
                 check_in=check_in,
@@ -1,18 +1,91 @@
 ﻿from __future__ import annotations
 
-from camping_bot.adapters.base import SiteAdapter
-from camping_bot.adapters.interpark_anseong_adapter import InterparkAnseongAdapter
-from camping_bot.adapters.mock_adapter import MockAdapter
+import importlib
+from importlib.metadata import entry_points
+from typing import TYPE_CHECKING, Mapping
 
-ADAPTERS: dict[str, type[SiteAdapter]] = {
-    "mock": MockAdapter,
-    "interpark_anseong": InterparkAnseongAdapter,
+if TYPE_CHECKING:
+    from camping_bot.adapters.base import SiteAdapter
+
+# installed packages register adapters under this entry point group:
+#   [project.entry-points."camping_bot.adapters"]
+#   my_site = "my_pkg.my_site:MySiteAdapter"
+ENTRY_POINT_GROUP = "camping_bot.adapters"
+
+# built-ins as "module:Class" targets, so importing the registry loads no adapter module
+BUILTIN_ADAPTERS: dict[str, str] = {
+    "mock": "camping_bot.adapters.mock_adapter:MockAdapter",
+    "interpark_anseong": "camping_bot.adapters.interpark_anseong_adapter:InterparkAnseongAdapter",
 }
 
+# names registered from the `adapters:` section of the YAML config
+_configured: dict[str, str] = {}
+_loaded: dict[str, type[SiteAdapter]] = {}
+
+
+def check_target(target: str) -> str:
+    if ":" not in target:
+        raise ValueError(f"Adapter target must look like 'package.module:Class': {target}")
+    return target
+
+
+def register_adapter(name: str, target: str) -> None:
+    """Map `name` to a "module:Class" target; nothing is imported until a job uses it."""
+    check_target(target)
+    if _configured.get(name) != target:
+        _configured[name] = target
+        _loaded.pop(name, None)
+
+
+def configured_adapters() -> dict[str, str]:
+    return dict(_configured)
+
 
-def get_adapter(name: str) -> type[SiteAdapter]:
-    adapter_cls = ADAPTERS.get(name)
-    if not adapter_cls:
-        available = ", ".join(sorted(ADAPTERS))
-        raise ValueError(f"Unknown adapter '{name}'. Available: {available}")
+def available_adapters() -> dict[str, tuple[str, str]]:
+    """name -> (source, target) for every known adapter, without importing any of them."""
+    found = {name: ("builtin", target) for name, target in BUILTIN_ADAPTERS.items()}
+    for ep in entry_points(group=ENTRY_POINT_GROUP):
+        found[ep.name] = (f"entry point ({ep.dist.name if ep.dist else '?'})", ep.value)
+    for name, target in _configured.items():
+        found[name] = ("config", target)
+    return found
+
+
+def get_adapter(name: str, pending: Mapping[str, str] | None = None) -> type[SiteAdapter]:
+    """Resolve a registered adapter name, or a "module:Class" path, importing it on first use.
+
+    `pending` holds config registrations that are not committed yet (a reload
+    being validated); they take precedence but leave the registry untouched.
+    """
+    if pending and name in pending and _configured.get(name) != pending[name]:
+        return _import_target(name, check_target(pending[name]))
+
+    adapter_cls = _loaded.get(name)
+    if adapter_cls is not None:
+        return adapter_cls
+
+    if ":" in name:
+        target = name
+    else:
+        known = available_adapters()
+        if name not in known:
+            available = ", ".join(sorted(known))
+            raise ValueError(f"Unknown adapter '{name}'. Available: {available}")
+        target = known[name][1]
+
+    adapter_cls = _import_target(name, target)
+    _loaded[name] = adapter_cls
     return adapter_cls
+
+
+def _import_target(name: str, target: str) -> type[SiteAdapter]:
+    from camping_bot.adapters.base import SiteAdapter
+
+    module_name, _, attr = target.partition(":")
+    try:
+        obj = getattr(importlib.import_module(module_name), attr)
+    except (ImportError, AttributeError) as exc:
+        raise ValueError(f"Cannot load adapter '{name}' from {target}: {exc}") from exc
+    if not (isinstance(obj, type) and issubclass(obj, SiteAdapter)):
+        raise ValueError(f"Adapter '{name}' ({target}) is not a SiteAdapter subclass")
+    return obj
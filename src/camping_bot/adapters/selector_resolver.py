@@ -0,0 +1,119 @@
+﻿from __future__ import annotations
+
+import asyncio
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any
+
+# Playwright-only syntax that document.querySelector rejects: engine prefixes
+# (text=, role=, xpath=, css=), XPath, chaining and Playwright pseudo-classes
+_PLAYWRIGHT_ONLY = re.compile(
+    r"^\s*(?:[a-zA-Z_-]+=|//|\.\./|\()|>>"
+    r"|:(?:has-text|text|text-is|text-matches|visible|nth-match|left-of|right-of|above|below|near)\("
+    r"|:visible\b"
+)
+
+
+@dataclass(frozen=True)
+class _Winner:
+    selector: str
+    frame_url: str
+
+
+class SelectorMemory:
+    """Which fallback selector (and in which frame) matched last time, per role.
+
+    The runner keeps one per job so the memory survives across runs.
+    """
+
+    def __init__(self) -> None:
+        self._winners: dict[str, _Winner] = {}
+
+    def get(self, role: str) -> _Winner | None:
+        return self._winners.get(role)
+
+    def remember(self, role: str, selector: str, frame_url: str) -> None:
+        self._winners[role] = _Winner(selector=selector, frame_url=frame_url)
+
+    def forget(self, role: str) -> None:
+        self._winners.pop(role, None)
+
+
+class SelectorResolver:
+    def __init__(self, memory: SelectorMemory) -> None:
+        self.memory = memory
+
+    async def resolve(
+        self,
+        role: str,
+        contexts: list[Any],
+        candidates: list[str],
+    ) -> tuple[Any, str] | None:
+        """Return (page-or-frame, selector) for the first candidate present.
+
+        The remembered winner is tried first with a single count(); on a miss
+        one count() per context × candidate is issued concurrently. That is
+        still N×M protocol calls, but their latencies overlap instead of
+        adding up; locator counts are kept (rather than one in-page
+        querySelectorAll batch) so Playwright-only selectors and shadow DOM
+        keep matching.
+        """
+        if not contexts or not candidates:
+            return None
+
+        winner = self.memory.get(role)
+        if winner and winner.selector in candidates:
+            for ctx in contexts:
+                if _url(ctx) != winner.frame_url:
+                    continue
+                if await _count(ctx, winner.selector) > 0:
+                    return ctx, winner.selector
+                break
+
+        counts = await asyncio.gather(
+            *(_count(ctx, selector) for ctx in contexts for selector in candidates)
+        )
+        width = len(candidates)
+        for ctx_idx, ctx in enumerate(contexts):
+            row = counts[ctx_idx * width : (ctx_idx + 1) * width]
+            for selector, count in zip(candidates, row):
+                if count > 0:
+                    self.memory.remember(role, selector, _url(ctx))
+                    return ctx, selector
+
+        self.memory.forget(role)
+        return None
+
+
+def _url(ctx: Any) -> str:
+    try:
+        return str(ctx.url)
+    except Exception:
+        return ""
+
+
+async def _count(ctx: Any, selector: str) -> int:
+    try:
+        return await ctx.locator(selector).count()
+    except Exception:
+        return 0
+
+
+@lru_cache(maxsize=64)
+def split_has_text(selector: str) -> tuple[str, str | None]:
+    """Split a Playwright `css:has-text('x')` selector into plain CSS and text for in-page use."""
+    match = re.fullmatch(r"(.*?):has-text\(([\"'])(.*)\2\)", selector.strip())
+    if not match:
+        return selector, None
+    return match.group(1), match.group(3)
+
+
+def check_in_page_selector(role: str, selector: str) -> None:
+    """Raise ValueError unless `selector` works with querySelector (plus one trailing :has-text())."""
+    css, _ = split_has_text(selector)
+    if _PLAYWRIGHT_ONLY.search(css):
+        raise ValueError(
+            f"criteria.selectors.{role} is read in-page and must be plain CSS "
+            f"(optionally ending in :has-text('...')): {selector}"
+        )
@@ -0,0 +1,101 @@
+﻿from __future__ import annotations
+
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from zoneinfo import ZoneInfo
+
+from apscheduler.triggers.base import BaseTrigger
+
+from camping_bot.models import PollingPolicy
+
+
+@dataclass
+class PollState:
+    """Feedback from the runner: when availability last changed and how many
+    polls in a row saw nothing new."""
+
+    last_change_at: datetime | None = None
+    quiet_polls: int = 0
+
+    def record(self, changed: bool) -> None:
+        if changed:
+            self.last_change_at = datetime.now(timezone.utc)
+            self.quiet_polls = 0
+        else:
+            self.quiet_polls += 1
+
+
+class AdaptiveTrigger(BaseTrigger):
+    """APScheduler trigger whose interval follows the job's polling policy.
+
+    Inside a burst window the window's interval wins; shortly after an
+    observed change the boost interval is used; otherwise the interval grows
+    by `backoff_factor` per quiet poll from `min_interval_seconds` up to
+    `max_interval_seconds`. A sleeping job is woken at the next window start.
+    """
+
+    def __init__(self, policy: PollingPolicy, state: PollState) -> None:
+        self.policy = policy
+        self.state = state
+        self._tz = ZoneInfo(policy.timezone) if policy.timezone else None
+
+    @classmethod
+    def fixed(cls, interval_seconds: float, state: PollState) -> AdaptiveTrigger:
+        policy = PollingPolicy(
+            min_interval_seconds=interval_seconds,
+            max_interval_seconds=interval_seconds,
+        )
+        return cls(policy, state)
+
+    def get_next_fire_time(
+        self, previous_fire_time: datetime | None, now: datetime
+    ) -> datetime | None:
+        _ = previous_fire_time
+        candidate = now + timedelta(seconds=self.next_interval(now))
+        window_start = self._next_window_start(now)
+        if window_start is not None and window_start < candidate:
+            return window_start
+        return candidate
+
+    def next_interval(self, now: datetime) -> float:
+        policy = self.policy
+        local_now = self._local(now)
+        for window in policy.burst_windows:
+            if window.contains(local_now.time()):
+                return window.interval_seconds
+
+        last_change = self.state.last_change_at
+        if (
+            last_change is not None
+            and policy.change_boost_seconds > 0
+            and (now - last_change).total_seconds() < policy.change_boost_seconds
+        ):
+            return policy.change_boost_interval_seconds or policy.min_interval_seconds
+
+        quiet = min(self.state.quiet_polls, 64)
+        interval = policy.min_interval_seconds * (policy.backoff_factor**quiet)
+        return min(max(interval, policy.min_interval_seconds), policy.max_interval_seconds)
+
+    def _next_window_start(self, now: datetime) -> datetime | None:
+        local_now = self._local(now)
+        starts = []
+        for window in self.policy.burst_windows:
+            start = local_now.replace(
+                hour=window.start.hour,
+                minute=window.start.minute,
+                second=window.start.second,
+                microsecond=window.start.microsecond,
+            )
+            if start <= local_now:
+                start += timedelta(days=1)
+            starts.append(start)
+        return min(starts) if starts else None
+
+    def _local(self, now: datetime) -> datetime:
+        return now.astimezone(self._tz) if self._tz else now
+
+    def __str__(self) -> str:
+        return (
+            f"adaptive[min={self.policy.min_interval_seconds}s, "
+            f"max={self.policy.max_interval_seconds}s, windows={len(self.policy.burst_windows)}]"
+        )
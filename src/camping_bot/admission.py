@@ -0,0 +1,147 @@
+﻿from __future__ import annotations
+
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import AsyncIterator
+
+from camping_bot.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_BOOKING = 0
+PRIORITY_POLL = 10
+
+_PRIORITY_NAMES = {PRIORITY_BOOKING: "booking", PRIORITY_POLL: "poll"}
+
+
+@dataclass(order=True)
+class _Waiter:
+    priority: int
+    last_served: float
+    seq: int
+    job: str = field(compare=False)
+    future: asyncio.Future[None] = field(compare=False)
+
+
+class AdmissionController:
+    """Runner-wide gate in front of browser-heavy work.
+
+    At most `max_sessions` runs hold a browser at once; booking-priority runs
+    jump the queue and may use `booking_reserve` extra slots so they never
+    wait behind routine polls. Within a priority, the job served least
+    recently goes first. When `min_free_mb` is set, new sessions are held
+    while MemAvailable is below it (unless nothing is running).
+    """
+
+    def __init__(
+        self,
+        metrics: Metrics,
+        max_sessions: int,
+        booking_reserve: int = 1,
+        min_free_mb: int = 0,
+    ) -> None:
+        self.metrics = metrics
+        self._max_sessions = max(1, max_sessions)
+        self._booking_reserve = max(0, booking_reserve)
+        self._min_free_mb = min_free_mb
+        self._active = 0
+        self._heap: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._last_served: dict[str, float] = {}
+        self._recheck: asyncio.TimerHandle | None = None
+
+    @property
+    def active(self) -> int:
+        return self._active
+
+    @property
+    def queued(self) -> int:
+        return sum(1 for waiter in self._heap if not waiter.future.done())
+
+    @asynccontextmanager
+    async def admit(self, job: str, priority: int = PRIORITY_POLL) -> AsyncIterator[None]:
+        waiter = _Waiter(
+            priority=priority,
+            last_served=self._last_served.get(job, 0.0),
+            seq=next(self._seq),
+            job=job,
+            future=asyncio.get_running_loop().create_future(),
+        )
+        enqueued = time.monotonic()
+        heapq.heappush(self._heap, waiter)
+        self._dispatch()
+        try:
+            await waiter.future
+        except asyncio.CancelledError:
+            if waiter.future.done() and not waiter.future.cancelled():
+                self._release()
+            raise
+
+        waited = time.monotonic() - enqueued
+        label = _PRIORITY_NAMES.get(priority, str(priority))
+        self.metrics.observe("camping_bot_admission_wait_seconds", waited, job=job, priority=label)
+        if waited > 1:
+            logger.info("[%s] 동시 실행 한도로 %.1f초 대기 후 실행(%s)", job, waited, label)
+        self._last_served[job] = time.monotonic()
+        try:
+            yield
+        finally:
+            self._release()
+
+    def _release(self) -> None:
+        self._active -= 1
+        self._dispatch()
+
+    def _capacity(self, priority: int) -> int:
+        if priority <= PRIORITY_BOOKING:
+            return self._max_sessions + self._booking_reserve
+        return self._max_sessions
+
+    def _dispatch(self) -> None:
+        while self._heap:
+            head = self._heap[0]
+            if head.future.done():
+                heapq.heappop(self._heap)
+                continue
+            if self._active >= self._capacity(head.priority):
+                break
+            if self._active > 0 and not self._memory_ok():
+                self._schedule_recheck()
+                break
+            heapq.heappop(self._heap)
+            self._active += 1
+            head.future.set_result(None)
+        self.metrics.gauge("camping_bot_admission_active", self._active)
+        self.metrics.gauge("camping_bot_admission_queued", self.queued)
+
+    def _schedule_recheck(self) -> None:
+        if self._recheck is not None and not self._recheck.cancelled():
+            return
+
+        def recheck() -> None:
+            self._recheck = None
+            self._dispatch()
+
+        self._recheck = asyncio.get_running_loop().call_later(1.0, recheck)
+
+    def _memory_ok(self) -> bool:
+        if self._min_free_mb <= 0:
+            return True
+        available = _mem_available_mb()
+        return available is None or available >= self._min_free_mb
+
+
+def _mem_available_mb() -> int | None:
+    try:
+        for line in Path("/proc/meminfo").read_text().splitlines():
+            if line.startswith("MemAvailable:"):
+                return int(line.split()[1]) // 1024
+    except (OSError, ValueError, IndexError):
+        return None
+    return None
@@ -0,0 +1,178 @@
+﻿from __future__ import annotations
+
+import argparse
+import asyncio
+import contextlib
+import copy
+import dataclasses
+import json
+import logging
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+from camping_bot.config import load_jobs
+from camping_bot.metrics import PHASE_METRIC
+from camping_bot.models import JobConfig, RuntimeConfig
+from camping_bot.notifier import Notifier
+from camping_bot.runner import JobRunner
+from camping_bot.settings import load_runtime_config
+from camping_bot.testing.fake_campsite import FakeCampsiteOptions, FakeCampsiteServer
+
+
+def _bench_job(template: JobConfig, server: FakeCampsiteServer | None) -> JobConfig:
+    criteria = copy.deepcopy(template.criteria)
+    for key in ("login_url", "probe", "http_probe", "warm_session"):
+        criteria.pop(key, None)
+    criteria["captcha_mode"] = "fixed"
+    criteria["manual_login_fallback"] = False
+    if server is None:
+        # replaying a recording: keep the URL and account it was recorded with
+        base_url, credentials = template.base_url, template.credentials
+    else:
+        base_url = server.base_url
+        credentials = {"username": server.options.username, "password": server.options.password}
+    return dataclasses.replace(
+        template,
+        enabled=True,
+        base_url=base_url,
+        credentials=credentials,
+        criteria=criteria,
+        polling=None,
+        opening=None,
+        plan=None,
+    )
+
+
+def _bench_runtime(state_dir: str, book: bool, warm: bool, har: str | None) -> RuntimeConfig:
+    runtime = load_runtime_config()
+    return dataclasses.replace(
+        runtime,
+        dry_run=not book,
+        headless=True,
+        captcha_mode="fixed",
+        storage_state_path=str(Path(state_dir) / "storage_state.json"),
+        telegram_bot_token=None,
+        telegram_chat_id=None,
+        shared_search_ttl_seconds=0.0,
+        warm_sessions=warm,
+        http_probe=False,
+        metrics_port=0,
+        timing_log_path=None,
+        har_mode="replay" if har else "off",
+        har_replay_path=har,
+        history_db_path=None,
+    )
+
+
+async def run_benchmark(
+    config_path: str,
+    runs: int,
+    options: FakeCampsiteOptions,
+    book: bool = False,
+    warm: bool = False,
+    har: str | None = None,
+) -> dict:
+    """Run the real Interpark adapter through JobRunner against the fake site.
+
+    With `har`, runs replay that recording (HAR_MODE=record output) instead,
+    so the same session can be timed before and after an adapter change.
+    """
+    templates = [job for job in load_jobs(config_path) if job.adapter == "interpark_anseong"]
+    if not templates:
+        raise SystemExit(f"No interpark_anseong job in {config_path}")
+
+    os.environ["CAPTCHA_FIXED_CODE"] = options.captcha_code
+    site = contextlib.nullcontext() if har else FakeCampsiteServer(options)
+    with site as server, tempfile.TemporaryDirectory() as state_dir:
+        runtime = _bench_runtime(state_dir, book, warm, har)
+        job = _bench_job(templates[0], server)
+        notifier = Notifier(runtime)
+        runner = JobRunner(runtime, notifier)
+        try:
+            for _ in range(runs):
+                runner.forget_slots(job.name)
+                await runner.run_once(job)
+        finally:
+            await runner.close()
+            await notifier.close()
+
+        phases = {}
+        for labels, summary in runner.metrics.summaries(PHASE_METRIC).items():
+            phase = dict(labels)["phase"]
+            phases[phase] = {
+                "n": summary.count,
+                "p50_ms": round(summary.quantile(0.5) * 1000, 1),
+                "p95_ms": round(summary.quantile(0.95) * 1000, 1),
+            }
+        return {
+            "runs": runs,
+            "errors": int(
+                sum(
+                    runner.metrics.counter(
+                        "camping_bot_runs_total", job=job.name, adapter=job.adapter, outcome=outcome
+                    )
+                    for outcome in ("error", "timeout")
+                )
+            ),
+            "site": {"har": har}
+            if server is None
+            else {
+                "requests": server.stats.requests,
+                "logins": server.stats.logins,
+                "searches": server.stats.searches,
+                "reservations": len(server.stats.reservations),
+            },
+            "budget_hits": dict(runner.budget_hits.get(job.name, {})),
+            "phases": dict(sorted(phases.items())),
+        }
+
+
+def _print_report(report: dict) -> None:
+    print(f"runs={report['runs']} errors={report['errors']} site={report['site']}")
+    if report["budget_hits"]:
+        print(f"budget_hits={report['budget_hits']}")
+    width = max((len(name) for name in report["phases"]), default=5)
+    print(f"{'phase':<{width}}  {'n':>4}  {'p50 ms':>9}  {'p95 ms':>9}")
+    for name, stats in report["phases"].items():
+        print(f"{name:<{width}}  {stats['n']:>4}  {stats['p50_ms']:>9.1f}  {stats['p95_ms']:>9.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(
+        description="Benchmark InterparkAnseongAdapter + JobRunner against a local fake campsite"
+    )
+    parser.add_argument("--config", default="cfg/targets.example.yaml")
+    parser.add_argument("--runs", type=int, default=20)
+    parser.add_argument("--latency-ms", type=float, default=30.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--available", type=float, default=0.5, help="Share of decks available")
+    parser.add_argument("--seed", type=int, default=None)
+    parser.add_argument("--book", action="store_true", help="Go through book_slot (not dry-run)")
+    parser.add_argument("--warm", action="store_true", help="Use warm sessions")
+    parser.add_argument(
+        "--har", help="Replay this HAR recording (or newest in a directory) instead of the fake site"
+    )
+    parser.add_argument("--json", dest="json_path", help="Also write the report as JSON")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.WARNING, format="%(levelname)s %(name)s: %(message)s")
+    options = FakeCampsiteOptions(
+        latency_ms=args.latency_ms,
+        jitter_ms=args.jitter_ms,
+        available_ratio=args.available,
+        seed=args.seed,
+    )
+    report = asyncio.run(
+        run_benchmark(args.config, args.runs, options, args.book, args.warm, args.har)
+    )
+    _print_report(report)
+    if args.json_path:
+        Path(args.json_path).write_text(json.dumps(report, indent=2, ensure_ascii=False), encoding="utf-8")
+    if report["errors"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+﻿from __future__ import annotations
+
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
+from typing import Any, AsyncIterator
+
+from playwright.async_api import Browser, BrowserContext, Playwright, async_playwright
+
+from camping_bot.metrics import span
+from camping_bot.models import RuntimeConfig
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _PooledBrowser:
+    browser: Browser
+    runs: int = 0
+    active: int = 0
+    retiring: bool = False
+
+
+class ContextLease:
+    def __init__(self, pool: BrowserPool, pooled: _PooledBrowser, context: BrowserContext) -> None:
+        self._pool = pool
+        self._pooled = pooled
+        self.context = context
+        self._released = False
+
+    def is_alive(self) -> bool:
+        return not self._released and self._pooled.browser.is_connected()
+
+    async def release(self) -> None:
+        if self._released:
+            return
+        self._released = True
+        try:
+            async with asyncio.timeout(self._pool.teardown_seconds):
+                await self.context.close()
+        except Exception:
+            # a context that cannot close in time means a wedged renderer; retire the browser
+            logger.warning("컨텍스트 닫기 실패/시간 초과, 브라우저 교체 예정")
+            self._pooled.retiring = True
+        finally:
+            await self._pool._checkin(self._pooled)
+
+
+class BrowserPool:
+    """Long-lived Playwright driver with a bounded set of Chromium browsers.
+
+    Jobs borrow a fresh BrowserContext per run; browsers are recycled after
+    `browser_recycle_runs` runs and replaced when they disconnect. Closing a
+    context or browser is bounded by `teardown_timeout_seconds` so a hung
+    driver call cannot stall the run that is being torn down.
+    """
+
+    def __init__(self, runtime: RuntimeConfig) -> None:
+        self.runtime = runtime
+        self._size = max(1, runtime.browser_pool_size)
+        self._recycle_runs = max(1, runtime.browser_recycle_runs)
+        self.teardown_seconds = max(0.1, runtime.teardown_timeout_seconds)
+        self._pw: Playwright | None = None
+        self._browsers: list[_PooledBrowser] = []
+        self._lock = asyncio.Lock()
+        self._closed = False
+
+    async def _ensure_driver(self) -> Playwright:
+        if self._pw is None:
+            self._pw = await async_playwright().start()
+        return self._pw
+
+    async def _checkout(self) -> _PooledBrowser:
+        async with self._lock:
+            if self._closed:
+                raise RuntimeError("BrowserPool is closed")
+
+            for pooled in list(self._browsers):
+                if not pooled.browser.is_connected():
+                    logger.warning("브라우저 연결 끊김 감지, 풀에서 제거")
+                    self._browsers.remove(pooled)
+
+            live = [p for p in self._browsers if not p.retiring]
+            if len(live) < self._size:
+                with span("browser_launch"):
+                    pw = await self._ensure_driver()
+                    browser = await pw.chromium.launch(headless=self.runtime.headless)
+                pooled = _PooledBrowser(browser=browser)
+                self._browsers.append(pooled)
+            else:
+                pooled = min(live, key=lambda p: p.active)
+
+            pooled.active += 1
+            return pooled
+
+    async def _checkin(self, pooled: _PooledBrowser) -> None:
+        async with self._lock:
+            pooled.active -= 1
+            pooled.runs += 1
+            if pooled.runs >= self._recycle_runs:
+                pooled.retiring = True
+            if pooled.retiring and pooled.active == 0:
+                if pooled in self._browsers:
+                    self._browsers.remove(pooled)
+                await self._close_browser(pooled.browser)
+
+    async def lease(self, **context_options: Any) -> ContextLease:
+        """Borrow a context that outlives a single run (warm sessions)."""
+        pooled = await self._checkout()
+        try:
+            with span("context_create"):
+                context = await pooled.browser.new_context(**context_options)
+        except Exception:
+            pooled.retiring = True
+            await self._checkin(pooled)
+            raise
+        return ContextLease(self, pooled, context)
+
+    @asynccontextmanager
+    async def context(self, **context_options: Any) -> AsyncIterator[BrowserContext]:
+        lease = await self.lease(**context_options)
+        try:
+            yield lease.context
+        finally:
+            await lease.release()
+
+    async def close(self) -> None:
+        async with self._lock:
+            self._closed = True
+            browsers, self._browsers = self._browsers, []
+            for pooled in browsers:
+                await self._close_browser(pooled.browser)
+            if self._pw is not None:
+                await self._pw.stop()
+                self._pw = None
+
+    async def _close_browser(self, browser: Browser) -> None:
+        try:
+            async with asyncio.timeout(self.teardown_seconds):
+                await browser.close()
+        except TimeoutError:
+            logger.warning("브라우저 닫기 %.0f초 초과, 연결을 버림", self.teardown_seconds)
+        except Exception:
+            logger.debug("browser close failed", exc_info=True)
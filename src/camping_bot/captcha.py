@@ -12,8 +12,14 @@ class CaptchaSolver(ABC):
 
 
 class ManualCaptchaSolver(CaptchaSolver):
+    """Asks on the console. Prompts are serialized process-wide so parallel stay
+    tabs (or jobs) never read stdin at the same time."""
+
+    _console = asyncio.Lock()
+
     async def solve(self, prompt: str) -> str:
-        return (await asyncio.to_thread(input, prompt)).strip()
+        async with self._console:
+            return (await asyncio.to_thread(input, prompt)).strip()
 
 
 class FixedCaptchaSolver(CaptchaSolver):
@@ -0,0 +1,83 @@
+﻿from __future__ import annotations
+
+import asyncio
+import logging
+import math
+import time
+from dataclasses import dataclass
+from email.utils import parsedate_to_datetime
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ClockOffset:
+    offset_seconds: float  # server clock minus local clock
+    uncertainty_seconds: float
+    samples: int
+
+    def to_local(self, server_epoch: float) -> float:
+        return server_epoch - self.offset_seconds
+
+
+async def estimate_clock_offset(
+    client: httpx.AsyncClient,
+    url: str,
+    samples: int = 8,
+) -> ClockOffset:
+    """Estimate the target server's clock offset from its `Date` headers.
+
+    `Date` only has one-second resolution, so each response bounds the
+    offset to an interval: the server stamped floor(server_time) somewhere
+    between sending and receiving. Requests are spaced by 1 + 1/samples
+    seconds so they hit different sub-second phases, and intersecting the
+    intervals narrows the estimate well below one second.
+    """
+    low, high = -math.inf, math.inf
+    used = 0
+    for idx in range(max(1, samples)):
+        sent = time.time()
+        try:
+            response = await client.head(url)
+        except httpx.HTTPError as exc:
+            logger.warning("시계 동기화 요청 실패: %s", exc)
+            continue
+        received = time.time()
+
+        header = response.headers.get("date")
+        if not header:
+            continue
+        server = parsedate_to_datetime(header).timestamp()
+        sample_low, sample_high = server - received, server + 1 - sent
+        if sample_low > high or sample_high < low:
+            # inconsistent sample (clock step or proxy cache); start over from it
+            low, high = sample_low, sample_high
+        else:
+            low, high = max(low, sample_low), min(high, sample_high)
+        used += 1
+
+        if idx < samples - 1:
+            await asyncio.sleep(1 + 1 / samples)
+
+    if not used:
+        return ClockOffset(offset_seconds=0.0, uncertainty_seconds=math.inf, samples=0)
+    return ClockOffset(
+        offset_seconds=(low + high) / 2,
+        uncertainty_seconds=(high - low) / 2,
+        samples=used,
+    )
+
+
+async def sleep_until(epoch: float, spin_seconds: float = 0.02) -> None:
+    """Sleep until the local wall clock reaches `epoch`.
+
+    The bulk is a normal asyncio sleep; the last `spin_seconds` yield in a
+    tight loop to avoid timer-granularity overshoot.
+    """
+    remaining = epoch - time.time()
+    if remaining > spin_seconds:
+        await asyncio.sleep(remaining - spin_seconds)
+    while time.time() < epoch:
+        await asyncio.sleep(0)
@@ -1,14 +1,30 @@
 ﻿from __future__ import annotations
 
+from datetime import datetime, time
 from pathlib import Path
+from typing import Any
 
 import yaml
 
-from camping_bot.models import JobConfig
+from camping_bot.adapters.registry import get_adapter, register_adapter
+from camping_bot.models import BurstWindow, JobConfig, JobPlan, OpeningBell, PollingPolicy
+from camping_bot.plan import compile_plan
 
 
 def load_jobs(config_path: str) -> list[JobConfig]:
+    jobs, adapters = read_config(config_path)
+    commit_adapters(adapters)
+    return jobs
+
+
+def read_config(config_path: str) -> tuple[list[JobConfig], dict[str, str]]:
+    """Parse and validate the config without touching the adapter registry.
+
+    Returns the jobs and the `adapters:` registrations; callers commit the
+    latter with `commit_adapters` once they accept the config.
+    """
     raw = yaml.safe_load(Path(config_path).read_text(encoding="utf-8")) or {}
+    adapters = {str(name): str(target) for name, target in (raw.get("adapters") or {}).items()}
     jobs = []
     for item in raw.get("jobs", []):
         jobs.append(
@@ -20,7 +36,95 @@ def load_jobs(config_path: str) -> list[JobConfig]:
                 interval_seconds=int(item.get("interval_seconds", 30)),
                 credentials=item.get("credentials", {}),
                 criteria=item.get("criteria", {}),
+                polling=_parse_polling(item.get("polling"), int(item.get("interval_seconds", 30))),
+                opening=_parse_opening(item.get("opening")),
             )
         )
-    return jobs
+    validate_jobs(jobs, adapters)
+    return jobs, adapters
+
+
+def commit_adapters(adapters: dict[str, str]) -> None:
+    for name, target in adapters.items():
+        register_adapter(name, target)
+
+
+def validate_jobs(jobs: list[JobConfig], adapters: dict[str, str] | None = None) -> None:
+    """Compile every job's plan; raise ValueError for configs that would only fail once scheduled."""
+    seen: set[str] = set()
+    for job in jobs:
+        if job.name in seen:
+            raise ValueError(f"Duplicate job name: {job.name}")
+        seen.add(job.name)
+        if not job.enabled:
+            # keep unused adapters unimported; a reload that enables the job compiles it
+            continue
+        try:
+            job.plan = compile_job(job, adapters)
+        except (TypeError, ValueError) as exc:
+            raise ValueError(f"[{job.name}] {exc}") from exc
+        if job.interval_seconds <= 0:
+            raise ValueError(f"[{job.name}] interval_seconds must be positive")
+        policy = job.polling
+        if policy and not 0 < policy.min_interval_seconds <= policy.max_interval_seconds:
+            raise ValueError(
+                f"[{job.name}] polling needs 0 < min_interval_seconds <= max_interval_seconds"
+            )
 
+
+def compile_job(job: JobConfig, adapters: dict[str, str] | None = None) -> JobPlan:
+    return compile_plan(job.criteria, get_adapter(job.adapter, adapters))
+
+
+def _parse_polling(raw: dict[str, Any] | None, interval_seconds: int) -> PollingPolicy | None:
+    if not raw:
+        return None
+    windows = [
+        BurstWindow(
+            start=_parse_time(window["start"]),
+            end=_parse_time(window["end"]),
+            interval_seconds=float(window.get("interval_seconds", 1)),
+        )
+        for window in raw.get("burst_windows", [])
+    ]
+    boost_interval = raw.get("change_boost_interval_seconds")
+    return PollingPolicy(
+        min_interval_seconds=float(raw.get("min_interval_seconds", interval_seconds)),
+        max_interval_seconds=float(raw.get("max_interval_seconds", interval_seconds)),
+        backoff_factor=float(raw.get("backoff_factor", 1.0)),
+        change_boost_seconds=float(raw.get("change_boost_seconds", 0)),
+        change_boost_interval_seconds=float(boost_interval) if boost_interval else None,
+        timezone=raw.get("timezone"),
+        burst_windows=windows,
+    )
+
+
+def _parse_opening(raw: dict[str, Any] | None) -> OpeningBell | None:
+    if not raw:
+        return None
+    open_at = raw["open_at"]
+    if not isinstance(open_at, datetime):
+        open_at = datetime.fromisoformat(str(open_at))
+    if open_at.tzinfo is None:
+        open_at = open_at.astimezone()
+    return OpeningBell(
+        open_at=open_at,
+        prewarm_seconds=float(raw.get("prewarm_seconds", 60)),
+        clock_samples=int(raw.get("clock_samples", 8)),
+    )
+
+
+def _parse_time(value: Any) -> time:
+    # unquoted YAML 1.1 values arrive as sexagesimal ints: 10:05 -> 605, 10:05:00 -> 36300.
+    # Only values without a leading zero are converted, so H:MM is always < 3600
+    # and H:MM:SS always >= 3600; 09:30 and other quoted values stay strings.
+    if isinstance(value, bool):
+        raise ValueError(f"Invalid time: {value!r}")
+    if isinstance(value, int):
+        hours, minutes, seconds = (value // 60, value % 60, 0) if value < 3600 else (
+            value // 3600, value // 60 % 60, value % 60
+        )
+        if hours > 23:
+            raise ValueError(f"Invalid time {value!r}; quote times in the config, e.g. \"10:05\"")
+        return time(hours, minutes, seconds)
+    return time.fromisoformat(str(value))
@@ -0,0 +1,95 @@
+﻿from __future__ import annotations
+
+import asyncio
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import AsyncIterator
+
+# share of the run's total budget each phase may use; the run deadline still caps every phase
+PHASE_SHARES = {
+    "login": 0.5,
+    "search": 0.5,
+    "book": 1.0,
+}
+
+
+class DeadlineExceeded(TimeoutError):
+    def __init__(self, phase: str, seconds: float) -> None:
+        super().__init__(f"{phase} deadline exceeded ({seconds:.1f}s)")
+        self.phase = phase
+        self.seconds = seconds
+
+
+@dataclass(frozen=True)
+class Deadline:
+    started: float
+    expires: float
+
+    @property
+    def total(self) -> float:
+        return self.expires - self.started
+
+    def remaining(self) -> float:
+        return max(0.0, self.expires - asyncio.get_running_loop().time())
+
+    def expired(self) -> bool:
+        return self.remaining() <= 0
+
+
+_current: ContextVar[Deadline | None] = ContextVar("camping_bot_deadline", default=None)
+
+
+def current_deadline() -> Deadline | None:
+    return _current.get()
+
+
+def clamp_ms(budget_ms: int) -> int:
+    """Shrink a wait budget so it never outlives the current run's deadline."""
+    deadline = _current.get()
+    if deadline is None:
+        return budget_ms
+    return max(1, min(budget_ms, int(deadline.remaining() * 1000)))
+
+
+@asynccontextmanager
+async def run_deadline(seconds: float) -> AsyncIterator[Deadline]:
+    """Cancel the block after `seconds` and raise DeadlineExceeded("run").
+
+    The deadline is visible to nested `phase()` blocks and `clamp_ms()` through
+    a context variable, so it also reaches tasks the run spawns.
+    """
+    now = asyncio.get_running_loop().time()
+    deadline = Deadline(started=now, expires=now + seconds)
+    token = _current.set(deadline)
+    try:
+        async with asyncio.timeout_at(deadline.expires) as timeout:
+            yield deadline
+    except TimeoutError as exc:
+        if timeout.expired() and not isinstance(exc, DeadlineExceeded):
+            raise DeadlineExceeded("run", seconds) from exc
+        raise
+    finally:
+        _current.reset(token)
+
+
+@asynccontextmanager
+async def phase(name: str) -> AsyncIterator[None]:
+    """Run one phase under its share of the current run deadline (no-op outside a run)."""
+    deadline = _current.get()
+    if deadline is None:
+        yield
+        return
+    now = asyncio.get_running_loop().time()
+    expires = now + PHASE_SHARES.get(name, 1.0) * deadline.total
+    if expires >= deadline.expires:
+        # capped by the run deadline anyway; let the outer timeout report it
+        yield
+        return
+    try:
+        async with asyncio.timeout_at(expires) as timeout:
+            yield
+    except TimeoutError as exc:
+        if timeout.expired() and not isinstance(exc, DeadlineExceeded):
+            raise DeadlineExceeded(name, expires - now) from exc
+        raise
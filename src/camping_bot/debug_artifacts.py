@@ -0,0 +1,151 @@
+﻿from __future__ import annotations
+
+import asyncio
+import gzip
+import logging
+import os
+import re
+import time
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+# already-compressed formats are stored as-is
+_STORED_RAW = (".png", ".jpg", ".jpeg", ".zip")
+
+
+class ArtifactStore:
+    """Debug captures written off the event loop into a bounded ring buffer.
+
+    `submit` only enqueues bytes; one background task gzips text artifacts,
+    writes them under `root` and deletes the oldest files once the directory
+    holds more than `max_files` files or `max_bytes` bytes. `allow` rate-limits
+    captures per job so a flapping selector cannot flood the disk.
+    """
+
+    def __init__(
+        self,
+        root: str | None,
+        max_files: int = 200,
+        max_bytes: int = 200 * 1024 * 1024,
+        min_interval_seconds: float = 60.0,
+    ) -> None:
+        self.root = Path(root) if root else None
+        self._max_files = max(1, max_files)
+        self._max_bytes = max(1, max_bytes)
+        self._min_interval = min_interval_seconds
+        self._last_capture: dict[tuple[str, str], float] = {}
+        self._queue: asyncio.Queue[tuple[Path, bytes]] = asyncio.Queue(maxsize=32)
+        self._ring: deque[tuple[Path, int]] | None = None
+        self._ring_bytes = 0
+        self._worker: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.root is not None
+
+    def allow(self, job: str, kind: str = "capture") -> bool:
+        """Claim the job's slot for `kind`; False while it is inside the rate-limit window.
+
+        Each kind is limited separately, so a screenshot taken on the way to a
+        failure does not cost the failure trace its slot.
+        """
+        if self.root is None:
+            return False
+        now = time.monotonic()
+        last = self._last_capture.get((job, kind))
+        if last is not None and now - last < self._min_interval:
+            return False
+        self._last_capture[(job, kind)] = now
+        return True
+
+    def path_for(self, job: str, tag: str, suffix: str) -> Path:
+        assert self.root is not None
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+        slug = re.sub(r"[^0-9A-Za-z._-]+", "_", f"{job}_{tag}")
+        return self.root / f"{slug}_{stamp}{suffix}"
+
+    def submit(self, path: Path, data: bytes) -> None:
+        if self._queue.full():
+            logger.warning("디버그 저장 큐가 가득 차 폐기: %s", path.name)
+            return
+        self._queue.put_nowait((path, data))
+        self._ensure_worker()
+
+    def adopt(self, path: Path) -> None:
+        """Account for a file written directly into `root` (e.g. a Playwright trace)."""
+        self.submit(path, b"")
+
+    async def close(self, timeout: float = 10.0) -> None:
+        if self._worker is None:
+            return
+        try:
+            await asyncio.wait_for(self._queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("디버그 저장 대기 시간 초과: 남은 %d건 폐기", self._queue.qsize())
+        self._worker.cancel()
+        try:
+            await self._worker
+        except asyncio.CancelledError:
+            pass
+        self._worker = None
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._drain(), name="debug-artifacts")
+
+    async def _drain(self) -> None:
+        while True:
+            path, data = await self._queue.get()
+            try:
+                await asyncio.to_thread(self._write, path, data)
+            except Exception:
+                logger.exception("디버그 파일 저장 실패: %s", path)
+            finally:
+                self._queue.task_done()
+
+    def _write(self, path: Path, data: bytes) -> None:
+        if self._ring is None:
+            self._ring = self._scan()
+        if data:
+            if path.suffix.lower() not in _STORED_RAW:
+                path = path.with_name(path.name + ".gz")
+                data = gzip.compress(data, compresslevel=6)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            path.write_bytes(data)
+        try:
+            size = path.stat().st_size
+        except OSError:
+            return
+        self._ring.append((path, size))
+        self._ring_bytes += size
+        self._prune()
+
+    def _scan(self) -> deque[tuple[Path, int]]:
+        assert self.root is not None
+        self.root.mkdir(parents=True, exist_ok=True)
+        entries = []
+        for path in self.root.iterdir():
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            if path.is_file():
+                entries.append((stat.st_mtime, path, stat.st_size))
+        entries.sort()
+        self._ring_bytes = sum(size for _, _, size in entries)
+        return deque((path, size) for _, path, size in entries)
+
+    def _prune(self) -> None:
+        assert self._ring is not None
+        while self._ring and (
+            len(self._ring) > self._max_files or self._ring_bytes > self._max_bytes
+        ):
+            path, size = self._ring.popleft()
+            self._ring_bytes -= size
+            try:
+                os.unlink(path)
+            except OSError:
+                pass
@@ -0,0 +1,58 @@
+﻿from __future__ import annotations
+
+import logging
+import re
+from datetime import datetime
+from pathlib import Path
+from typing import Any
+
+from playwright.async_api import BrowserContext
+
+logger = logging.getLogger(__name__)
+
+HAR_MODES = ("off", "record", "replay")
+
+
+def record_options(har_dir: str, job: str) -> tuple[Path, dict[str, Any]]:
+    """Context options that record this run's traffic; Playwright writes the file on context close."""
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S_%f")
+    path = Path(har_dir) / f"{_slug(job)}_{stamp}.har.zip"
+    path.parent.mkdir(parents=True, exist_ok=True)
+    return path, {
+        "record_har_path": str(path),
+        "record_har_content": "attach",
+        "record_har_mode": "full",
+    }
+
+
+def find_replay_har(replay_path: str, job: str) -> Path | None:
+    """A HAR file as given, or the newest recording of `job` inside a directory."""
+    path = Path(replay_path)
+    if path.is_file():
+        return path
+    if not path.is_dir():
+        return None
+    # exact "<slug>_<stamp>.har[.zip]" so job "a" never picks up job "a_b"'s recordings
+    pattern = re.compile(rf"{re.escape(_slug(job))}_\d{{8}}_\d{{6}}_\d{{6}}\.har(?:\.zip)?")
+    recordings = sorted(
+        (p for p in path.iterdir() if pattern.fullmatch(p.name)), key=lambda p: p.stat().st_mtime
+    )
+    return recordings[-1] if recordings else None
+
+
+async def install_replay(context: BrowserContext, har: Path) -> None:
+    """Serve every request from `har`; anything not recorded is aborted so runs stay offline."""
+    await context.route_from_har(har, not_found="abort")
+
+
+def timings_path(har: Path) -> Path:
+    name = har.name.removesuffix(".zip").removesuffix(".har")
+    return har.with_name(f"{name}.timings.json")
+
+
+def write_timings(har: Path, record: str) -> None:
+    timings_path(har).write_text(record + "\n", encoding="utf-8")
+
+
+def _slug(job: str) -> str:
+    return re.sub(r"[^0-9A-Za-z._-]+", "_", job)
@@ -0,0 +1,327 @@
+﻿from __future__ import annotations
+
+import argparse
+import asyncio
+import sqlite3
+import threading
+import time
+from collections import Counter
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone, tzinfo
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from camping_bot.slot_cache import SlotChanges
+
+STATE_DISAPPEARED = -1
+STATE_PRESENT = 0
+STATE_APPEARED = 1
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS sites (
+    id INTEGER PRIMARY KEY,
+    job TEXT NOT NULL,
+    site_name TEXT NOT NULL,
+    zone TEXT NOT NULL,
+    check_in TEXT NOT NULL,
+    nights INTEGER NOT NULL,
+    UNIQUE (job, site_name, check_in, nights)
+);
+CREATE TABLE IF NOT EXISTS polls (
+    id INTEGER PRIMARY KEY,
+    job TEXT NOT NULL,
+    ts INTEGER NOT NULL,
+    available INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS polls_job_ts ON polls (job, ts);
+CREATE TABLE IF NOT EXISTS observations (
+    poll_id INTEGER NOT NULL,
+    site_id INTEGER NOT NULL,
+    state INTEGER NOT NULL,
+    PRIMARY KEY (poll_id, site_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS observations_site_state ON observations (site_id, state);
+"""
+
+_SiteKey = tuple[str, str, str, str, int]
+
+
+@dataclass
+class _PendingPoll:
+    job: str
+    ts: int
+    # (site_name, zone, check_in, nights, state)
+    rows: list[tuple[str, str, str, int, int]]
+
+
+class HistoryStore:
+    """SQLite log of every poll's slot set, for finding when cancellations show up.
+
+    `record` only buffers; `flush` writes the buffer in one transaction off the
+    event loop once it is `flush_seconds` old (or on close). The database runs
+    in WAL mode so the query CLI can read while the bot writes, and polls older
+    than `retention_days` are deleted at most once an hour.
+    """
+
+    def __init__(
+        self,
+        path: str | None,
+        retention_days: float = 90.0,
+        flush_seconds: float = 30.0,
+    ) -> None:
+        self.path = Path(path) if path else None
+        self._retention_seconds = retention_days * 86400
+        self._flush_seconds = flush_seconds
+        self._pending: list[_PendingPoll] = []
+        self._oldest_pending: float | None = None
+        self._conn: sqlite3.Connection | None = None
+        self._db_lock = threading.Lock()
+        self._flush_lock = asyncio.Lock()
+        self._site_ids: dict[_SiteKey, int] = {}
+        self._last_prune = 0.0
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def record(self, job: str, changes: SlotChanges) -> None:
+        if self.path is None:
+            return
+        # after a restart or cache reset nothing is known to have just opened up
+        appeared_state = STATE_PRESENT if changes.baseline else STATE_APPEARED
+        rows = [
+            (slot.site_name, slot.zone, slot.check_in, slot.nights, state)
+            for state, slots in (
+                (appeared_state, changes.appeared),
+                (STATE_PRESENT, changes.unchanged),
+                (STATE_DISAPPEARED, changes.disappeared),
+            )
+            for slot in slots
+        ]
+        self._pending.append(_PendingPoll(job, int(time.time()), rows))
+        if self._oldest_pending is None:
+            self._oldest_pending = time.monotonic()
+
+    async def flush(self, force: bool = False) -> None:
+        if not self._pending:
+            return
+        due = time.monotonic() - (self._oldest_pending or 0.0) >= self._flush_seconds
+        if not (force or due):
+            return
+        async with self._flush_lock:
+            batch, self._pending = self._pending, []
+            self._oldest_pending = None
+            await asyncio.to_thread(self._write, batch)
+
+    async def close(self) -> None:
+        await self.flush(force=True)
+        with self._db_lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+    def _connect(self) -> sqlite3.Connection:
+        if self._conn is None:
+            assert self.path is not None
+            self._conn = open_history_db(self.path)
+        return self._conn
+
+    def _write(self, batch: list[_PendingPoll]) -> None:
+        with self._db_lock:
+            conn = self._connect()
+            with conn:
+                for poll in batch:
+                    cursor = conn.execute(
+                        "INSERT INTO polls (job, ts, available) VALUES (?, ?, ?)",
+                        (
+                            poll.job,
+                            poll.ts,
+                            sum(1 for row in poll.rows if row[4] != STATE_DISAPPEARED),
+                        ),
+                    )
+                    poll_id = cursor.lastrowid
+                    conn.executemany(
+                        "INSERT OR REPLACE INTO observations (poll_id, site_id, state) "
+                        "VALUES (?, ?, ?)",
+                        [
+                            (poll_id, self._site_id(conn, poll.job, *row[:4]), row[4])
+                            for row in poll.rows
+                        ],
+                    )
+                now = time.time()
+                if now - self._last_prune >= 3600:
+                    self._last_prune = now
+                    self._prune(conn, int(now - self._retention_seconds))
+
+    def _site_id(
+        self, conn: sqlite3.Connection, job: str, name: str, zone: str, check_in: str, nights: int
+    ) -> int:
+        key = (job, name, zone, check_in, nights)
+        site_id = self._site_ids.get(key)
+        if site_id is None:
+            conn.execute(
+                "INSERT INTO sites (job, site_name, zone, check_in, nights) VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (job, site_name, check_in, nights) DO UPDATE SET zone = excluded.zone",
+                (job, name, zone, check_in, nights),
+            )
+            site_id = conn.execute(
+                "SELECT id FROM sites WHERE job = ? AND site_name = ? AND check_in = ? AND nights = ?",
+                (job, name, check_in, nights),
+            ).fetchone()[0]
+            self._site_ids[key] = site_id
+        return site_id
+
+    def _prune(self, conn: sqlite3.Connection, cutoff: int) -> None:
+        if self._retention_seconds <= 0:
+            return
+        conn.execute(
+            "DELETE FROM observations WHERE poll_id IN (SELECT id FROM polls WHERE ts < ?)",
+            (cutoff,),
+        )
+        conn.execute("DELETE FROM polls WHERE ts < ?", (cutoff,))
+        conn.execute(
+            "DELETE FROM sites WHERE id NOT IN (SELECT DISTINCT site_id FROM observations)"
+        )
+        self._site_ids.clear()
+
+
+def open_history_db(path: Path, readonly: bool = False) -> sqlite3.Connection:
+    if readonly:
+        return sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    conn = sqlite3.connect(path, check_same_thread=False)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    conn.executescript(_SCHEMA)
+    return conn
+
+
+def appearance_histogram(
+    conn: sqlite3.Connection,
+    job: str | None = None,
+    site_name: str | None = None,
+    check_in: str | None = None,
+    bucket_minutes: int = 60,
+    tz: tzinfo | None = None,
+    since: datetime | None = None,
+) -> list[tuple[str, int]]:
+    """Count new-availability events per time-of-day bucket, in `tz` (local time by default).
+
+    Jobs watching the same site each record its appearance; across jobs an
+    appearance counts only if the site was last reported gone (or never seen).
+    """
+    timestamps = _event_timestamps(conn, STATE_APPEARED, job, site_name, check_in, since)
+    bucket_minutes = max(1, min(bucket_minutes, 1440))
+    counts: Counter[int] = Counter()
+    for ts in timestamps:
+        moment = datetime.fromtimestamp(ts, tz) if tz else datetime.fromtimestamp(ts)
+        minute_of_day = moment.hour * 60 + moment.minute
+        counts[minute_of_day // bucket_minutes * bucket_minutes] += 1
+    return [
+        (f"{start // 60:02d}:{start % 60:02d}", counts.get(start, 0))
+        for start in range(0, 1440, bucket_minutes)
+    ]
+
+
+def recent_events(
+    conn: sqlite3.Connection,
+    job: str | None = None,
+    site_name: str | None = None,
+    check_in: str | None = None,
+    limit: int = 50,
+) -> list[tuple[int, str, str, str, int, int]]:
+    """Latest appear/disappear events as (ts, job, site_name, check_in, nights, state)."""
+    where, params = _filters(job, site_name, check_in)
+    rows = conn.execute(
+        "SELECT p.ts, s.job, s.site_name, s.check_in, s.nights, o.state "
+        "FROM observations o JOIN polls p ON p.id = o.poll_id JOIN sites s ON s.id = o.site_id "
+        f"WHERE o.state != 0{where} ORDER BY p.ts DESC LIMIT ?",
+        (*params, limit),
+    )
+    return rows.fetchall()
+
+
+def _event_timestamps(
+    conn: sqlite3.Connection,
+    state: int,
+    job: str | None,
+    site_name: str | None,
+    check_in: str | None,
+    since: datetime | None,
+) -> list[int]:
+    where, params = _filters(job, site_name, check_in)
+    if since is not None:
+        where += " AND p.ts >= ?"
+        params.append(int(since.timestamp()))
+    rows = conn.execute(
+        "SELECT p.ts, s.site_name, s.check_in, s.nights, o.state "
+        "FROM observations o JOIN polls p ON p.id = o.poll_id "
+        f"JOIN sites s ON s.id = o.site_id WHERE o.state != 0{where} ORDER BY p.ts, p.id",
+        params,
+    )
+    # merge every job's events per site; a repeat of the site's last state is another
+    # job reporting the same event
+    last: dict[tuple[str, str, int], int] = {}
+    timestamps = []
+    for ts, name, day, nights, observed in rows:
+        previous = last.get((name, day, nights))
+        last[(name, day, nights)] = observed
+        if observed == state and previous != state:
+            timestamps.append(ts)
+    return timestamps
+
+
+def _filters(
+    job: str | None, site_name: str | None, check_in: str | None
+) -> tuple[str, list[object]]:
+    where = ""
+    params: list[object] = []
+    for column, value in (("s.job", job), ("s.site_name", site_name), ("s.check_in", check_in)):
+        if value:
+            where += f" AND {column} = ?"
+            params.append(value)
+    return where, params
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Query the availability history database")
+    parser.add_argument("--db", default="logs/history.sqlite3")
+    parser.add_argument("--job")
+    parser.add_argument("--site", help="Site name, e.g. A-12")
+    parser.add_argument("--check-in", help="Check-in date, e.g. 2026-05-16")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    hours = sub.add_parser("appearances", help="Time-of-day distribution of new availability")
+    hours.add_argument("--bucket", type=int, default=60, help="Bucket size in minutes")
+    hours.add_argument("--tz", help="Timezone name (default: local)")
+    hours.add_argument("--days", type=float, help="Only the last N days")
+
+    events = sub.add_parser("events", help="Latest appear/disappear events")
+    events.add_argument("--limit", type=int, default=50)
+    args = parser.parse_args()
+
+    path = Path(args.db)
+    if not path.exists():
+        raise SystemExit(f"No history database at {path}")
+    conn = open_history_db(path, readonly=True)
+    tz = ZoneInfo(args.tz) if getattr(args, "tz", None) else None
+
+    if args.command == "appearances":
+        since = datetime.now(timezone.utc) - timedelta(days=args.days) if args.days else None
+        histogram = appearance_histogram(
+            conn, args.job, args.site, args.check_in, args.bucket, tz, since
+        )
+        peak = max((count for _, count in histogram), default=0) or 1
+        for label, count in histogram:
+            print(f"{label}  {count:>5}  {'#' * round(40 * count / peak)}")
+    else:
+        for ts, job, site, check_in, nights, state in recent_events(
+            conn, args.job, args.site, args.check_in, args.limit
+        ):
+            moment = datetime.fromtimestamp(ts).strftime("%Y-%m-%d %H:%M:%S")
+            kind = "새 자리" if state == STATE_APPEARED else "사라짐"
+            print(f"{moment}  {kind}  {job}  {site}  {check_in} {nights}박")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+﻿from __future__ import annotations
+
+import logging
+from typing import Any, Iterable
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+
+def cookies_from_playwright(cookies: Iterable[dict[str, Any]]) -> httpx.Cookies:
+    jar = httpx.Cookies()
+    for cookie in cookies:
+        name = cookie.get("name")
+        if not name:
+            continue
+        jar.set(
+            name,
+            str(cookie.get("value", "")),
+            domain=str(cookie.get("domain", "")),
+            path=str(cookie.get("path", "/")),
+        )
+    return jar
+
+
+def build_probe_client(storage_state: dict[str, Any] | None, timeout_ms: int) -> httpx.AsyncClient:
+    """Keep-alive client for browserless availability probes, seeded with one account's cookies."""
+    return httpx.AsyncClient(
+        timeout=timeout_ms / 1000,
+        follow_redirects=True,
+        cookies=cookies_from_playwright((storage_state or {}).get("cookies", [])),
+        headers={"User-Agent": "Mozilla/5.0 (compatible; camping-bot probe)"},
+        limits=httpx.Limits(max_keepalive_connections=10, max_connections=20),
+    )
@@ -10,11 +10,12 @@ from pathlib import Path
 if __package__ in (None, ""):
     sys.path.append(str(Path(__file__).resolve().parents[1]))
 
+from camping_bot.adapters.registry import available_adapters, register_adapter
 from camping_bot.config import load_jobs
 from camping_bot.notifier import Notifier
-from camping_bot.runner import JobRunner
-from camping_bot.scheduler import build_scheduler
+from camping_bot.scheduler import serve_jobs
 from camping_bot.settings import load_runtime_config
+from camping_bot.supervisor import Supervisor
 
 
 logging.basicConfig(
@@ -23,30 +24,62 @@ logging.basicConfig(
 )
 
 
-async def _serve(config_path: str) -> None:
+async def _serve(config_path: str, workers: int) -> None:
     runtime = load_runtime_config()
     notifier = Notifier(runtime)
     jobs = load_jobs(config_path)
 
-    runner = JobRunner(runtime, notifier)
-    scheduler = build_scheduler(runner, jobs)
-    scheduler.start()
-
-    await notifier.send(f"캠핑 예약 봇 시작: jobs={len(jobs)}, dry_run={runtime.dry_run}")
+    await notifier.send(
+        f"캠핑 예약 봇 시작: jobs={len(jobs)}, workers={workers}, dry_run={runtime.dry_run}"
+    )
 
     try:
-        while True:
-            await asyncio.sleep(3600)
+        if workers > 1:
+            if runtime.config_reload_seconds > 0:
+                logging.getLogger(__name__).info("--workers 사용 시 설정 자동 반영 꺼짐")
+            await Supervisor(runtime, notifier, jobs, workers).run()
+        else:
+            await serve_jobs(runtime, notifier, jobs, config_path=config_path)
     finally:
-        scheduler.shutdown(wait=False)
+        await notifier.close()
+
+
+def _list_adapters(config_path: str | None) -> None:
+    """Print known adapters without importing any adapter module."""
+    if config_path:
+        import yaml
+
+        raw = yaml.safe_load(Path(config_path).read_text(encoding="utf-8")) or {}
+        for name, target in (raw.get("adapters") or {}).items():
+            register_adapter(str(name), str(target))
+    adapters = available_adapters()
+    width = max(len(name) for name in adapters)
+    for name, (source, target) in sorted(adapters.items()):
+        print(f"{name:<{width}}  {target}  [{source}]")
 
 
 def main() -> None:
     parser = argparse.ArgumentParser(description="Camping reservation bot")
-    parser.add_argument("--config", required=True, help="Path to YAML config")
+    parser.add_argument("--config", help="Path to YAML config")
+    parser.add_argument(
+        "--list-adapters",
+        action="store_true",
+        help="List available site adapters (built-in, entry points, config) and exit",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=1,
+        help="Number of worker processes to shard jobs across (default: 1, in-process)",
+    )
     args = parser.parse_args()
 
-    asyncio.run(_serve(args.config))
+    if args.list_adapters:
+        _list_adapters(args.config)
+        return
+    if not args.config:
+        parser.error("--config is required")
+    asyncio.run(_serve(args.config, args.workers))
 
 
 if __name__ == "__main__":
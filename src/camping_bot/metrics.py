@@ -0,0 +1,229 @@
+﻿from __future__ import annotations
+
+import asyncio
+import functools
+import json
+import logging
+import time
+from collections import deque
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+from typing import Any, Awaitable, Callable, Iterator, TypeVar
+
+logger = logging.getLogger(__name__)
+
+Labels = tuple[tuple[str, str], ...]
+T = TypeVar("T")
+
+PHASE_METRIC = "camping_bot_phase_seconds"
+QUANTILES = (0.5, 0.9, 0.95, 0.99)
+
+
+class RollingSummary:
+    """Quantiles over the last `window` observations plus all-time sum/count."""
+
+    def __init__(self, window: int) -> None:
+        self.samples: deque[float] = deque(maxlen=window)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.samples.append(value)
+        self.total += value
+        self.count += 1
+
+    def quantile(self, q: float) -> float:
+        if not self.samples:
+            return 0.0
+        ordered = sorted(self.samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Metrics:
+    def __init__(self, window: int = 512, timing_log_path: str | None = None) -> None:
+        self._window = window
+        self._summaries: dict[tuple[str, Labels], RollingSummary] = {}
+        self._counters: dict[tuple[str, Labels], float] = {}
+        self._gauges: dict[tuple[str, Labels], float] = {}
+        self._timing_log = Path(timing_log_path) if timing_log_path else None
+        self._pending_lines: list[str] = []
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = (name, _labels(labels))
+        summary = self._summaries.get(key)
+        if summary is None:
+            summary = self._summaries[key] = RollingSummary(self._window)
+        summary.observe(value)
+
+    def inc(self, name: str, amount: float = 1.0, **labels: str) -> None:
+        key = (name, _labels(labels))
+        self._counters[key] = self._counters.get(key, 0.0) + amount
+
+    def gauge(self, name: str, value: float, **labels: str) -> None:
+        self._gauges[(name, _labels(labels))] = value
+
+    def summaries(self, name: str) -> dict[Labels, RollingSummary]:
+        return {labels: s for (n, labels), s in self._summaries.items() if n == name}
+
+    def counter(self, name: str, **labels: str) -> float:
+        return self._counters.get((name, _labels(labels)), 0.0)
+
+    @contextmanager
+    def track_run(self, job: str, adapter: str) -> Iterator[RunRecorder]:
+        """Collect spans for one run; emitted as summaries and one JSONL record."""
+        recorder = RunRecorder(job, adapter)
+        token = _recorder.set(recorder)
+        stack_token = _stack.set(())
+        start = time.perf_counter()
+        try:
+            yield recorder
+        except BaseException:
+            if recorder.outcome == "ok":
+                recorder.outcome = "error"
+            raise
+        finally:
+            _stack.reset(stack_token)
+            _recorder.reset(token)
+            recorder.spans.append(("run", time.perf_counter() - start))
+            for phase, seconds in recorder.spans:
+                self.observe(PHASE_METRIC, seconds, job=job, adapter=adapter, phase=phase)
+            self.inc("camping_bot_runs_total", job=job, adapter=adapter, outcome=recorder.outcome)
+            if self._timing_log is not None:
+                self._pending_lines.append(recorder.to_json())
+
+    async def flush(self) -> None:
+        if not self._pending_lines or self._timing_log is None:
+            return
+        lines, self._pending_lines = self._pending_lines, []
+        await asyncio.to_thread(self._append_lines, self._timing_log, lines)
+
+    @staticmethod
+    def _append_lines(path: Path, lines: list[str]) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with path.open("a", encoding="utf-8") as fh:
+            fh.write("\n".join(lines) + "\n")
+
+    def render_prometheus(self) -> str:
+        out: list[str] = []
+        typed: set[str] = set()
+        for (name, labels), summary in sorted(self._summaries.items()):
+            if name not in typed:
+                out.append(f"# TYPE {name} summary")
+                typed.add(name)
+            for q in QUANTILES:
+                out.append(f"{name}{_fmt(labels + (('quantile', str(q)),))} {summary.quantile(q):.6f}")
+            out.append(f"{name}_sum{_fmt(labels)} {summary.total:.6f}")
+            out.append(f"{name}_count{_fmt(labels)} {summary.count}")
+        for (name, labels), value in sorted(self._counters.items()):
+            if name not in typed:
+                out.append(f"# TYPE {name} counter")
+                typed.add(name)
+            out.append(f"{name}{_fmt(labels)} {value:g}")
+        for (name, labels), value in sorted(self._gauges.items()):
+            if name not in typed:
+                out.append(f"# TYPE {name} gauge")
+                typed.add(name)
+            out.append(f"{name}{_fmt(labels)} {value:g}")
+        return "\n".join(out) + "\n"
+
+
+class RunRecorder:
+    def __init__(self, job: str, adapter: str) -> None:
+        self.job = job
+        self.adapter = adapter
+        self.outcome = "ok"
+        self.started_at = time.time()
+        self.spans: list[tuple[str, float]] = []
+
+    def to_json(self) -> str:
+        return json.dumps(
+            {
+                "ts": round(self.started_at, 3),
+                "job": self.job,
+                "adapter": self.adapter,
+                "outcome": self.outcome,
+                "spans_ms": [[name, round(sec * 1000, 1)] for name, sec in self.spans],
+            },
+            ensure_ascii=False,
+        )
+
+
+_recorder: ContextVar[RunRecorder | None] = ContextVar("camping_bot_run", default=None)
+_stack: ContextVar[tuple[str, ...]] = ContextVar("camping_bot_span_stack", default=())
+
+
+@contextmanager
+def span(name: str) -> Iterator[None]:
+    """Time a phase of the current run; nested spans are recorded as parent/child.
+
+    A no-op outside Metrics.track_run, so library code can call it freely.
+    """
+    recorder = _recorder.get()
+    if recorder is None:
+        yield
+        return
+    path = (*_stack.get(), name)
+    token = _stack.set(path)
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _stack.reset(token)
+        recorder.spans.append(("/".join(path), time.perf_counter() - start))
+
+
+def timed(func: Callable[..., Awaitable[T]]) -> Callable[..., Awaitable[T]]:
+    """Decorate an async adapter step to record it as a sub-span named after the method."""
+    name = func.__name__.lstrip("_")
+
+    @functools.wraps(func)
+    async def wrapper(*args: Any, **kwargs: Any) -> T:
+        with span(name):
+            return await func(*args, **kwargs)
+
+    return wrapper
+
+
+async def serve_metrics(metrics: Metrics, host: str, port: int) -> asyncio.Server:
+    """Minimal HTTP endpoint: GET /metrics returns the Prometheus text format."""
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            request_line = await reader.readline()
+            while (await reader.readline()) not in (b"\r\n", b"\n", b""):
+                pass
+            parts = request_line.decode("latin-1").split()
+            if len(parts) >= 2 and parts[1].split("?")[0] == "/metrics":
+                status, body = "200 OK", metrics.render_prometheus().encode("utf-8")
+            else:
+                status, body = "404 Not Found", b"not found\n"
+            writer.write(
+                f"HTTP/1.1 {status}\r\n"
+                "Content-Type: text/plain; version=0.0.4; charset=utf-8\r\n"
+                f"Content-Length: {len(body)}\r\nConnection: close\r\n\r\n".encode("latin-1")
+                + body
+            )
+            await writer.drain()
+        except Exception:
+            logger.debug("metrics request failed", exc_info=True)
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    logger.info("metrics endpoint: http://%s:%d/metrics", host, port)
+    return server
+
+
+def _labels(labels: dict[str, str]) -> Labels:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _fmt(labels: Labels) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{k}="{_escape(v)}"' for k, v in labels) + "}"
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
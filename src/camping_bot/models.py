@@ -1,5 +1,73 @@
-﻿from dataclasses import dataclass, field
-from typing import Any
+﻿from dataclasses import dataclass, field, replace
+from datetime import datetime, time
+from typing import Any, Mapping
+
+
+@dataclass
+class BurstWindow:
+    start: time
+    end: time
+    interval_seconds: float
+
+    def contains(self, moment: time) -> bool:
+        if self.start <= self.end:
+            return self.start <= moment < self.end
+        return moment >= self.start or moment < self.end
+
+
+@dataclass
+class PollingPolicy:
+    min_interval_seconds: float
+    max_interval_seconds: float
+    backoff_factor: float = 1.0
+    change_boost_seconds: float = 0.0
+    change_boost_interval_seconds: float | None = None
+    timezone: str | None = None
+    burst_windows: list[BurstWindow] = field(default_factory=list)
+
+
+@dataclass
+class OpeningBell:
+    open_at: datetime
+    prewarm_seconds: float = 60.0
+    clock_samples: int = 8
+
+
+@dataclass(frozen=True)
+class Stay:
+    check_in: str | None
+    nights: int
+
+
+@dataclass(frozen=True, slots=True)
+class JobPlan:
+    """Criteria compiled and validated once at load time; adapters read this on the hot path."""
+
+    stays: tuple[Stay, ...]
+    multi_stay: bool
+    guests: int
+    max_parallel_searches: int
+    selectors: Mapping[str, tuple[str, ...]]
+    site_rank: Mapping[str, int]
+    preferred_zones: frozenset[str]
+    step_budgets_ms: Mapping[str, int]
+    criteria: Mapping[str, Any]
+    # routing.RouteProfile per mode, compiled from criteria.routing; None when the job sets none
+    route_profiles: Mapping[str, Any] | None = None
+
+    @property
+    def stay(self) -> Stay:
+        return self.stays[0]
+
+    def selector(self, role: str) -> str | None:
+        candidates = self.selectors.get(role)
+        return candidates[0] if candidates else None
+
+    def selector_list(self, role: str) -> tuple[str, ...]:
+        return self.selectors.get(role, ())
+
+    def for_stay(self, stay: Stay) -> "JobPlan":
+        return replace(self, stays=(stay,), multi_stay=False)
 
 
 @dataclass
@@ -11,6 +79,10 @@ class JobConfig:
     interval_seconds: int
     credentials: dict[str, str] = field(default_factory=dict)
     criteria: dict[str, Any] = field(default_factory=dict)
+    polling: PollingPolicy | None = None
+    opening: OpeningBell | None = None
+    # filled by config.compile_job; derived from the fields above so it stays out of eq
+    plan: JobPlan | None = field(default=None, compare=False, repr=False)
 
 
 @dataclass
@@ -32,4 +104,37 @@ class RuntimeConfig:
     storage_state_path: str | None
     telegram_bot_token: str | None
     telegram_chat_id: str | None
+    browser_pool_size: int = 2
+    browser_recycle_runs: int = 50
+    warm_sessions: bool = False
+    http_probe: bool = False
+    telegram_api_base: str = "https://api.telegram.org"
+    notify_dedup_seconds: float = 600.0
+    notify_batch_seconds: float = 2.0
+    shared_search_ttl_seconds: float = 5.0
+    slot_cache_ttl_seconds: float = 3600.0
+    slot_cache_max_size: int = 5000
+    request_blocking: bool = False
+    metrics_host: str = "127.0.0.1"
+    metrics_port: int = 0
+    timing_log_path: str | None = None
+    max_concurrent_sessions: int = 4
+    booking_reserved_sessions: int = 1
+    admission_min_free_mb: int = 0
+    session_max_age_seconds: float = 0.0
+    config_reload_seconds: float = 2.0
+    debug_artifacts_dir: str | None = "logs/debug"
+    debug_max_files: int = 200
+    debug_max_mb: int = 200
+    debug_min_interval_seconds: float = 60.0
+    debug_trace: bool = False
+    har_mode: str = "off"
+    har_dir: str = "logs/har"
+    har_replay_path: str | None = None
+    history_db_path: str | None = "logs/history.sqlite3"
+    history_retention_days: float = 90.0
+    history_flush_seconds: float = 30.0
+    run_deadline_seconds: float = 180.0
+    teardown_timeout_seconds: float = 10.0
+    loop_stall_seconds: float = 1.0
 
@@ -1,27 +1,172 @@
 ﻿from __future__ import annotations
 
+import asyncio
 import logging
+import time
+from dataclasses import dataclass
 
 import httpx
 
+from camping_bot.metrics import span
 from camping_bot.models import RuntimeConfig
 
 logger = logging.getLogger(__name__)
 
+TELEGRAM_MAX_CHARS = 4096
+
+
+@dataclass
+class _SeenMessage:
+    last_sent: float
+    suppressed: int = 0
+
 
 class Notifier:
+    """Fire-and-forget Telegram notifier.
+
+    `send` only logs and enqueues; one background task drains the queue with a
+    pooled keep-alive client, batches bursts into a single digest and retries
+    429/5xx with backoff. Messages sent with `coalesce=True` (repeating status
+    and error lines) are suppressed while the same text is inside the dedup
+    window; slot events are always delivered.
+    Delivery failures are logged and never propagate to the caller.
+    """
+
     def __init__(self, runtime: RuntimeConfig) -> None:
         self._token = runtime.telegram_bot_token
         self._chat_id = runtime.telegram_chat_id
+        self._api_base = runtime.telegram_api_base.rstrip("/")
+        self._dedup_seconds = runtime.notify_dedup_seconds
+        self._batch_seconds = runtime.notify_batch_seconds
+        self._max_attempts = 5
+        self._queue: asyncio.Queue[str] = asyncio.Queue(maxsize=1000)
+        self._seen: dict[str, _SeenMessage] = {}
+        self._client: httpx.AsyncClient | None = None
+        self._worker: asyncio.Task | None = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._token and self._chat_id)
+
+    async def send(self, message: str, coalesce: bool = False) -> None:
+        with span("notify"):
+            logger.info(message)
+            if not self.enabled:
+                return
+
+            if coalesce:
+                message = self._coalesce(message)
+                if message is None:
+                    return
+
+            if self._queue.full():
+                dropped = self._queue.get_nowait()
+                logger.warning("알림 큐가 가득 차 오래된 메시지 삭제: %s", dropped)
+            self._queue.put_nowait(message)
+            self._ensure_worker()
+
+    async def close(self, timeout: float = 10.0) -> None:
+        if self._worker is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=timeout)
+            except asyncio.TimeoutError:
+                logger.warning("알림 큐 비우기 시간 초과: 남은 %d건 폐기", self._queue.qsize())
+            self._worker.cancel()
+            try:
+                await self._worker
+            except asyncio.CancelledError:
+                pass
+            self._worker = None
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def _coalesce(self, message: str) -> str | None:
+        now = time.monotonic()
+        seen = self._seen.get(message)
+        if seen and now - seen.last_sent < self._dedup_seconds:
+            seen.suppressed += 1
+            return None
+
+        suppressed = seen.suppressed if seen else 0
+        self._seen[message] = _SeenMessage(last_sent=now)
+        if len(self._seen) > 1000:
+            cutoff = now - self._dedup_seconds
+            self._seen = {k: v for k, v in self._seen.items() if v.last_sent >= cutoff}
+        if suppressed:
+            return f"{message} (직전 {suppressed}회 반복 생략)"
+        return message
+
+    def _ensure_worker(self) -> None:
+        if self._worker is None or self._worker.done():
+            self._worker = asyncio.create_task(self._drain(), name="notifier-dispatch")
+
+    async def _drain(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            if self._batch_seconds > 0:
+                await asyncio.sleep(self._batch_seconds)
+            while not self._queue.empty():
+                batch.append(self._queue.get_nowait())
+
+            try:
+                for chunk in self._digest(batch):
+                    await self._deliver(chunk)
+            except Exception:
+                logger.exception("텔레그램 알림 전송 실패")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _digest(self, messages: list[str]) -> list[str]:
+        chunks: list[str] = []
+        current = ""
+        for message in messages:
+            message = message[:TELEGRAM_MAX_CHARS]
+            candidate = f"{current}\n{message}" if current else message
+            if len(candidate) > TELEGRAM_MAX_CHARS:
+                chunks.append(current)
+                candidate = message
+            current = candidate
+        if current:
+            chunks.append(current)
+        return chunks
 
-    async def send(self, message: str) -> None:
-        logger.info(message)
-        if not self._token or not self._chat_id:
-            return
+    async def _deliver(self, text: str) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                timeout=10,
+                limits=httpx.Limits(max_keepalive_connections=2, max_connections=4),
+            )
 
-        url = f"https://api.telegram.org/bot{self._token}/sendMessage"
-        payload = {"chat_id": self._chat_id, "text": message}
-        async with httpx.AsyncClient(timeout=10) as client:
-            response = await client.post(url, json=payload)
-            response.raise_for_status()
+        url = f"{self._api_base}/bot{self._token}/sendMessage"
+        payload = {"chat_id": self._chat_id, "text": text}
+        delay = 1.0
+        for attempt in range(1, self._max_attempts + 1):
+            try:
+                response = await self._client.post(url, json=payload)
+            except httpx.TransportError as exc:
+                logger.warning("텔레그램 연결 오류(%d/%d): %s", attempt, self._max_attempts, exc)
+            else:
+                if response.status_code == 429:
+                    delay = self._retry_after(response, delay)
+                    logger.warning("텔레그램 429, %.1f초 후 재시도", delay)
+                elif response.status_code >= 500:
+                    logger.warning("텔레그램 %d(%d/%d)", response.status_code, attempt, self._max_attempts)
+                else:
+                    response.raise_for_status()
+                    return
+            if attempt < self._max_attempts:
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, 60.0)
+        logger.error("텔레그램 알림 재시도 초과, 폐기: %s", text[:200])
 
+    def _retry_after(self, response: httpx.Response, fallback: float) -> float:
+        try:
+            return float(response.json()["parameters"]["retry_after"])
+        except (ValueError, KeyError, TypeError):
+            pass
+        try:
+            return float(response.headers.get("Retry-After", fallback))
+        except ValueError:
+            return fallback
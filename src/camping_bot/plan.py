@@ -0,0 +1,109 @@
+﻿from __future__ import annotations
+
+from datetime import date
+from types import MappingProxyType
+from typing import TYPE_CHECKING, Any
+
+from camping_bot.adapters.selector_resolver import check_in_page_selector
+from camping_bot.models import JobPlan
+from camping_bot.routing import compile_profiles
+from camping_bot.stays import expand_stays, is_multi_stay
+
+if TYPE_CHECKING:
+    from camping_bot.adapters.base import SiteAdapter
+
+# criteria keys the runner itself reads, valid for every adapter
+COMMON_CRITERIA_SCHEMA: dict[str, type | tuple[type, ...]] = {
+    "check_in": (str, date, list, dict),
+    "nights": (int, list),
+    "guests": int,
+    "preferred_zones": list,
+    "preferred_sites": list,
+    "max_parallel_searches": int,
+    "latency_budget_ms": dict,
+    "http_probe": bool,
+    "warm_session": bool,
+    "debug_trace": bool,
+    "run_deadline_seconds": (int, float),
+    "routing": (bool, dict),
+}
+
+
+def compile_plan(criteria: dict[str, Any], adapter_cls: type[SiteAdapter]) -> JobPlan:
+    """Validate `criteria` against the adapter's schema and normalize it into a JobPlan.
+
+    Raises ValueError naming the offending key, so typos fail at load time
+    instead of mid-booking.
+    """
+    schema = {**COMMON_CRITERIA_SCHEMA, **adapter_cls.criteria_schema}
+    for key, value in criteria.items():
+        expected = schema.get(key)
+        if expected is None:
+            raise ValueError(f"Unknown criteria key '{key}' for adapter {adapter_cls.__name__}")
+        if value is not None and not _is_instance(value, expected):
+            raise ValueError(f"criteria.{key} has invalid type {type(value).__name__}")
+
+    guests = int(criteria.get("guests", 1))
+    parallel = int(criteria.get("max_parallel_searches", 3))
+    if guests < 1 or parallel < 1:
+        raise ValueError("criteria.guests and criteria.max_parallel_searches must be >= 1")
+
+    budgets = dict(adapter_cls.default_step_budgets_ms)
+    for step, value in (criteria.get("latency_budget_ms") or {}).items():
+        budgets[str(step)] = int(value)
+
+    sites = [str(name) for name in criteria.get("preferred_sites") or []]
+    routing = criteria.get("routing")
+    route_profiles = MappingProxyType(compile_profiles(routing)) if routing else None
+    return JobPlan(
+        stays=tuple(expand_stays(criteria)),
+        multi_stay=is_multi_stay(criteria),
+        guests=guests,
+        max_parallel_searches=parallel,
+        selectors=MappingProxyType(_compile_selectors(criteria.get("selectors"), adapter_cls)),
+        site_rank=MappingProxyType({name: rank for rank, name in reversed(list(enumerate(sites)))}),
+        preferred_zones=frozenset(str(zone) for zone in criteria.get("preferred_zones") or []),
+        step_budgets_ms=MappingProxyType(budgets),
+        criteria=MappingProxyType(dict(criteria)),
+        route_profiles=route_profiles,
+    )
+
+
+def _compile_selectors(raw: Any, adapter_cls: type[SiteAdapter]) -> dict[str, tuple[str, ...]]:
+    if raw is None:
+        raw = {}
+    if not isinstance(raw, dict):
+        raise ValueError("criteria.selectors must be a mapping")
+
+    known = set(adapter_cls.selector_roles)
+    selectors: dict[str, tuple[str, ...]] = {}
+    for role, value in raw.items():
+        if known and role not in known:
+            raise ValueError(f"Unknown selector role '{role}' for adapter {adapter_cls.__name__}")
+        selectors[role] = _as_tuple(role, value)
+        if role in adapter_cls.in_page_selector_roles:
+            for selector in selectors[role]:
+                check_in_page_selector(role, selector)
+
+    missing = [role for role in adapter_cls.required_selectors if not selectors.get(role)]
+    if missing:
+        raise ValueError(f"Missing criteria.selectors: {', '.join(missing)}")
+    return selectors
+
+
+def _as_tuple(role: str, value: Any) -> tuple[str, ...]:
+    if value is None:
+        return ()
+    if isinstance(value, str):
+        return (value,) if value else ()
+    if isinstance(value, list) and all(isinstance(item, str) for item in value):
+        return tuple(item for item in value if item)
+    raise ValueError(f"criteria.selectors.{role} must be a string or a list of strings")
+
+
+def _is_instance(value: Any, expected: type | tuple[type, ...]) -> bool:
+    # bool is an int subclass; only accept it where bool is declared
+    if isinstance(value, bool):
+        kinds = expected if isinstance(expected, tuple) else (expected,)
+        return bool in kinds
+    return isinstance(value, expected)
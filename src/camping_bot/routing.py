@@ -0,0 +1,168 @@
+﻿from __future__ import annotations
+
+import logging
+import re
+from collections import Counter
+from dataclasses import dataclass, field
+from typing import Any
+
+from playwright.async_api import BrowserContext, Request, Response, Route
+
+from camping_bot.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+_TRACKER_PATTERNS = [
+    r"google-analytics\.com",
+    r"googletagmanager\.com",
+    r"doubleclick\.net",
+    r"facebook\.(net|com)/tr",
+    r"/beacon",
+]
+
+DEFAULT_PROFILES: dict[str, dict[str, Any]] = {
+    "search": {
+        "block_resource_types": ["image", "font", "media"],
+        "block_url_patterns": _TRACKER_PATTERNS,
+        "allow_url_patterns": [r"captcha"],
+    },
+    "book": {
+        "block_resource_types": ["media"],
+        "block_url_patterns": _TRACKER_PATTERNS,
+        "allow_url_patterns": [r"captcha"],
+    },
+}
+
+
+@dataclass(frozen=True)
+class RouteProfile:
+    block_resource_types: frozenset[str]
+    block_url_patterns: tuple[re.Pattern[str], ...]
+    allow_url_patterns: tuple[re.Pattern[str], ...]
+
+    @classmethod
+    def from_dict(cls, raw: dict[str, Any]) -> RouteProfile:
+        unknown = set(raw) - {"block_resource_types", "block_url_patterns", "allow_url_patterns"}
+        if unknown:
+            raise ValueError(f"Unknown routing keys: {', '.join(sorted(unknown))}")
+        return cls(
+            block_resource_types=frozenset(_strings(raw, "block_resource_types")),
+            block_url_patterns=_patterns(raw, "block_url_patterns"),
+            allow_url_patterns=_patterns(raw, "allow_url_patterns"),
+        )
+
+    def blocks(self, url: str, resource_type: str) -> bool:
+        if any(p.search(url) for p in self.allow_url_patterns):
+            return False
+        if resource_type in self.block_resource_types:
+            return True
+        return any(p.search(url) for p in self.block_url_patterns)
+
+
+@dataclass
+class RouteStats:
+    allowed_requests: int = 0
+    # from Content-Length; blocked requests are never fetched, so their size is unknown
+    allowed_bytes: int = 0
+    blocked_requests: int = 0
+    blocked_by_type: Counter[str] = field(default_factory=Counter)
+
+
+class RequestRouter:
+    """Per-job request filter installed on every BrowserContext of that job.
+
+    `mode` selects the profile: "search" (strict) during login/search and
+    "book" (permissive) during book_slot. With `metrics` the counts are also
+    exported as camping_bot_route_requests_total{job,decision,type} and
+    camping_bot_route_allowed_bytes_total{job}.
+    """
+
+    def __init__(
+        self, profiles: dict[str, RouteProfile], metrics: Metrics | None = None, job: str = ""
+    ) -> None:
+        self.profiles = profiles
+        self.mode = "search"
+        self.stats = RouteStats()
+        self._metrics = metrics
+        self._job = job
+
+    @classmethod
+    def from_criteria(cls, raw: Any, metrics: Metrics | None = None, job: str = "") -> RequestRouter:
+        return cls(compile_profiles(raw), metrics, job)
+
+    async def install(self, context: BrowserContext) -> None:
+        await context.route("**/*", self._handle)
+        context.on("response", self._on_response)
+
+    async def _handle(self, route: Route, request: Request) -> None:
+        profile = self.profiles.get(self.mode)
+        if profile and profile.blocks(request.url, request.resource_type):
+            self.stats.blocked_requests += 1
+            self.stats.blocked_by_type[request.resource_type] += 1
+            self._count("blocked", request.resource_type)
+            await route.abort("blockedbyclient")
+            return
+        await route.continue_()
+
+    def _on_response(self, response: Response) -> None:
+        try:
+            size = int(response.headers.get("content-length", "0"))
+        except ValueError:
+            size = 0
+        self.stats.allowed_requests += 1
+        self.stats.allowed_bytes += size
+        self._count("allowed", response.request.resource_type)
+        if self._metrics is not None and size:
+            self._metrics.inc("camping_bot_route_allowed_bytes_total", size, job=self._job)
+
+    def _count(self, decision: str, resource_type: str) -> None:
+        if self._metrics is not None:
+            self._metrics.inc(
+                "camping_bot_route_requests_total", job=self._job, decision=decision, type=resource_type
+            )
+
+    def summary(self) -> str:
+        s = self.stats
+        return (
+            f"allowed={s.allowed_requests}({s.allowed_bytes}B) "
+            f"blocked={s.blocked_requests} "
+            f"by_type={dict(s.blocked_by_type)}"
+        )
+
+
+def compile_profiles(raw: Any) -> dict[str, RouteProfile]:
+    """Merge criteria.routing (True or per-mode overrides) onto the defaults; ValueError if invalid."""
+    if isinstance(raw, bool):
+        raw = {}
+    if not isinstance(raw, dict):
+        raise ValueError("criteria.routing must be true/false or a mapping of mode -> profile")
+    unknown = set(raw) - set(DEFAULT_PROFILES)
+    if unknown:
+        raise ValueError(f"Unknown routing modes: {', '.join(sorted(map(str, unknown)))}")
+    profiles = {}
+    for mode, defaults in DEFAULT_PROFILES.items():
+        override = raw.get(mode) or {}
+        if not isinstance(override, dict):
+            raise ValueError(f"criteria.routing.{mode} must be a mapping")
+        try:
+            profiles[mode] = RouteProfile.from_dict({**defaults, **override})
+        except ValueError as exc:
+            raise ValueError(f"criteria.routing.{mode}: {exc}") from exc
+    return profiles
+
+
+def _strings(raw: dict[str, Any], key: str) -> list[str]:
+    value = raw.get(key, [])
+    if not isinstance(value, list) or not all(isinstance(item, str) for item in value):
+        raise ValueError(f"{key} must be a list of strings")
+    return value
+
+
+def _patterns(raw: dict[str, Any], key: str) -> tuple[re.Pattern[str], ...]:
+    compiled = []
+    for pattern in _strings(raw, key):
+        try:
+            compiled.append(re.compile(pattern))
+        except re.error as exc:
+            raise ValueError(f"{key}: invalid regex {pattern!r}: {exc}") from exc
+    return tuple(compiled)
@@ -1,21 +1,156 @@
 ﻿from __future__ import annotations
 
 import asyncio
-from collections import defaultdict
+import logging
+import time
+from collections import Counter, defaultdict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass
 from pathlib import Path
+from typing import Any, AsyncIterator
 
-from playwright.async_api import async_playwright
+import httpx
+from playwright.async_api import BrowserContext
 
+from camping_bot.adaptive_trigger import PollState
+from camping_bot.admission import PRIORITY_BOOKING, PRIORITY_POLL, AdmissionController
+from camping_bot.adapters.base import SiteAdapter
 from camping_bot.adapters.registry import get_adapter
-from camping_bot.models import JobConfig, RuntimeConfig, SlotResult
+from camping_bot.adapters.selector_resolver import SelectorMemory
+from camping_bot.browser_pool import BrowserPool, ContextLease
+from camping_bot.clock_sync import estimate_clock_offset, sleep_until
+from camping_bot.config import compile_job
+from camping_bot.deadline import DeadlineExceeded, current_deadline, phase, run_deadline
+from camping_bot.debug_artifacts import ArtifactStore
+from camping_bot.har import find_replay_har, install_replay, record_options, write_timings
+from camping_bot.history import HistoryStore
+from camping_bot.http_probe import build_probe_client, cookies_from_playwright
+from camping_bot.metrics import Metrics, span
+from camping_bot.models import JobConfig, JobPlan, RuntimeConfig, SlotResult
 from camping_bot.notifier import Notifier
+from camping_bot.routing import RequestRouter
+from camping_bot.search_share import SearchKey, SharedSearchCache, search_key
+from camping_bot.session_store import SessionKey, SessionStore
+from camping_bot.slot_cache import SlotCache
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class _WarmSession:
+    lease: ContextLease
+    adapter: SiteAdapter
+    runs: int = 0
+
+    def is_usable(self) -> bool:
+        return self.lease.is_alive() and not self.adapter.page.is_closed()
 
 
 class JobRunner:
     def __init__(self, runtime: RuntimeConfig, notifier: Notifier) -> None:
         self.runtime = runtime
         self.notifier = notifier
+        self.pool = BrowserPool(runtime)
         self._locks: dict[str, asyncio.Lock] = defaultdict(asyncio.Lock)
+        self._sessions: dict[str, _WarmSession] = {}
+        # probe clients per account, so each probe carries only its own session cookies
+        self._http: dict[SessionKey, httpx.AsyncClient] = {}
+        self.searches = SharedSearchCache(runtime.shared_search_ttl_seconds)
+        self.sessions = SessionStore(runtime.storage_state_path, runtime.session_max_age_seconds)
+        # HAR file being recorded by each job's current run (HAR_MODE=record)
+        self._har_recordings: dict[str, Path] = {}
+        # task running each job's current run and the monotonic time by which it must be gone
+        self._inflight: dict[str, tuple[asyncio.Task, float]] = {}
+        self._slot_caches: dict[str, SlotCache] = {}
+        self._selector_memory: dict[str, SelectorMemory] = defaultdict(SelectorMemory)
+        self.budget_hits: dict[str, Counter[str]] = defaultdict(Counter)
+        self.routers: dict[str, RequestRouter] = {}
+        self.poll_states: dict[str, PollState] = defaultdict(PollState)
+        self.metrics = Metrics(timing_log_path=runtime.timing_log_path)
+        self.history = HistoryStore(
+            runtime.history_db_path,
+            retention_days=runtime.history_retention_days,
+            flush_seconds=runtime.history_flush_seconds,
+        )
+        self.artifacts = ArtifactStore(
+            runtime.debug_artifacts_dir,
+            max_files=runtime.debug_max_files,
+            max_bytes=runtime.debug_max_mb * 1024 * 1024,
+            min_interval_seconds=runtime.debug_min_interval_seconds,
+        )
+        self.admission = AdmissionController(
+            self.metrics,
+            max_sessions=runtime.max_concurrent_sessions,
+            booking_reserve=runtime.booking_reserved_sessions,
+            min_free_mb=runtime.admission_min_free_mb,
+        )
+
+    async def close(self) -> None:
+        for name in list(self._sessions):
+            await self._drop_session(name)
+        await self.pool.close()
+        clients, self._http = self._http, {}
+        for client in clients.values():
+            await client.aclose()
+        await self.artifacts.close()
+        await self.history.close()
+
+    def _http_client(self, job: JobConfig) -> httpx.AsyncClient:
+        key = self._session_key(job)
+        client = self._http.get(key)
+        if client is None:
+            client = build_probe_client(self.sessions.get(key), self.runtime.timeout_ms)
+            self._http[key] = client
+        return client
+
+    def status(self) -> dict[str, Any]:
+        return {
+            "running": sorted(name for name, lock in self._locks.items() if lock.locked()),
+            "warm_sessions": len(self._sessions),
+            "admission_active": self.admission.active,
+            "admission_queued": self.admission.queued,
+            "budget_hits": {name: dict(hits) for name, hits in self.budget_hits.items()},
+        }
+
+    def forget_slots(self, name: str) -> None:
+        """Drop a job's slot observations so the next poll treats every slot as new."""
+        self._slot_caches.pop(name, None)
+
+    async def retire_job(self, name: str) -> None:
+        """Forget a job removed from the config once any in-flight run has finished."""
+        async with self._locks[name]:
+            await self._drop_session(name)
+            self._slot_caches.pop(name, None)
+            self._selector_memory.pop(name, None)
+            self.routers.pop(name, None)
+            self.poll_states.pop(name, None)
+            self.budget_hits.pop(name, None)
+
+    async def reconfigure_job(self, old: JobConfig, new: JobConfig) -> None:
+        """Carry per-job state over to an edited config, dropping only what the edit invalidates."""
+        if not new.enabled:
+            await self.retire_job(new.name)
+            return
+        async with self._locks[new.name]:
+            identity_changed = (old.adapter, old.base_url, old.credentials) != (
+                new.adapter,
+                new.base_url,
+                new.credentials,
+            )
+            session = self._sessions.get(new.name)
+            if identity_changed:
+                await self._drop_session(new.name)
+                self._selector_memory.pop(new.name, None)
+            elif session is not None:
+                session.adapter.criteria = new.criteria
+                session.adapter.plan = self._plan(new)
+            if old.criteria.get("routing") != new.criteria.get("routing"):
+                self.routers.pop(new.name, None)
+                if session is not None and not identity_changed:
+                    # the old router stays installed on the warm context; re-warm to apply the new one
+                    await self._drop_session(new.name)
+            if identity_changed or self._search_key(old) != self._search_key(new):
+                self.forget_slots(new.name)
 
     async def run_once(self, job: JobConfig) -> None:
         if not job.enabled:
@@ -23,76 +158,446 @@ class JobRunner:
 
         lock = self._locks[job.name]
         if lock.locked():
-            await self.notifier.send(f"[{job.name}] 이전 실행이 아직 진행 중이라 스킵")
+            # a run of this job is still queued or in flight; coalesce this tick into it
+            self.metrics.inc("camping_bot_skipped_ticks_total", job=job.name)
+            logger.debug("[%s] 이전 실행이 아직 진행 중이라 스킵", job.name)
+            await self._reap_stuck(job)
             return
 
         async with lock:
             await self._run_guarded(job)
 
+    async def run_opening(self, job: JobConfig) -> None:
+        """Pre-warm ahead of job.opening.open_at and fire search/book at the opening instant.
+
+        Unlike run_once this waits for an in-flight poll instead of skipping.
+        """
+        if not job.enabled or job.opening is None:
+            return
+        # the pre-warm wait is part of the run, so it extends the deadline
+        seconds = job.opening.prewarm_seconds + self._deadline_seconds(job)
+        async with self._locks[job.name]:
+            self._track_inflight(job, seconds)
+            try:
+                with self.metrics.track_run(job.name, job.adapter) as recorder:
+                    async with self._deadline(job, recorder, seconds):
+                        async with self.admission.admit(job.name, PRIORITY_BOOKING):
+                            await self._run_opening(job)
+            except Exception as exc:
+                await self.notifier.send(f"[{job.name}] 오픈 실행 오류: {exc}", coalesce=True)
+            finally:
+                self._inflight.pop(job.name, None)
+                await self.metrics.flush()
+
     async def _run_guarded(self, job: JobConfig) -> None:
+        recorder = None
+        seconds = self._deadline_seconds(job)
+        self._track_inflight(job, seconds)
         try:
-            await self._run(job)
+            with self.metrics.track_run(job.name, job.adapter) as recorder:
+                async with self._deadline(job, recorder, seconds):
+                    await self._run(job)
+        except DeadlineExceeded as exc:
+            await self.notifier.send(
+                f"[{job.name}] 시간 초과({exc.phase}, {exc.seconds:.0f}초)로 실행 취소", coalesce=True
+            )
         except Exception as exc:
-            await self.notifier.send(f"[{job.name}] 오류: {exc}")
+            await self.notifier.send(f"[{job.name}] 오류: {exc}", coalesce=True)
+        finally:
+            self._inflight.pop(job.name, None)
+            har = self._har_recordings.pop(job.name, None)
+            if har is not None and recorder is not None:
+                await asyncio.to_thread(write_timings, har, recorder.to_json())
+                logger.info("[%s] HAR 기록: %s", job.name, har)
+            await self.metrics.flush()
+            await self.history.flush()
+
+    def _deadline_seconds(self, job: JobConfig) -> float:
+        return float(job.criteria.get("run_deadline_seconds", self.runtime.run_deadline_seconds))
+
+    @asynccontextmanager
+    async def _deadline(self, job: JobConfig, recorder: Any, seconds: float) -> AsyncIterator[None]:
+        """Run the block under the job's run deadline and count the phase that ran out."""
+        try:
+            async with run_deadline(seconds):
+                yield
+        except DeadlineExceeded as exc:
+            recorder.outcome = "timeout"
+            self.metrics.inc("camping_bot_deadline_hits_total", job=job.name, phase=exc.phase)
+            logger.warning("[%s] %s", job.name, exc)
+            raise
+
+    def _track_inflight(self, job: JobConfig, seconds: float) -> None:
+        task = asyncio.current_task()
+        if task is not None:
+            # deadline cancellation plus two bounded teardowns (context, then browser)
+            grace = 2 * self.pool.teardown_seconds + 5
+            self._inflight[job.name] = (task, time.monotonic() + seconds + grace)
+
+    async def _reap_stuck(self, job: JobConfig) -> None:
+        """Cancel a run that outlived its deadline and teardown grace so the job lock frees up."""
+        inflight = self._inflight.get(job.name)
+        if inflight is None:
+            return
+        task, hard_deadline = inflight
+        if task.done() or time.monotonic() < hard_deadline:
+            return
+        self._inflight.pop(job.name, None)
+        self.metrics.inc("camping_bot_stuck_runs_total", job=job.name)
+        await self._drop_session(job.name)
+        task.cancel()
+        await self.notifier.send(f"[{job.name}] 실행이 제한 시간을 넘겨 멈춰 있어 강제 취소", coalesce=True)
 
     async def _run(self, job: JobConfig) -> None:
         adapter_cls = get_adapter(job.adapter)
+        if self._probe_enabled(job):
+            with span("probe"):
+                available = await adapter_cls.probe_availability(
+                    self._http_client(job), job.base_url, self._plan(job)
+                )
+            if available is False:
+                await self._select(job, [])
+                return
 
-        async with async_playwright() as pw:
-            browser = await pw.chromium.launch(headless=self.runtime.headless)
-            storage_state = self.runtime.storage_state_path
-            state_path = Path(storage_state) if storage_state else None
-            if state_path and state_path.exists():
-                context = await browser.new_context(storage_state=str(state_path))
-            else:
-                context = await browser.new_context()
-            page = await context.new_page()
-            page.set_default_timeout(self.runtime.timeout_ms)
-
-            adapter = adapter_cls(
-                page,
-                job.base_url,
-                job.credentials,
-                job.criteria,
-                self.runtime,
-            )
-            await adapter.login()
-            if state_path:
-                state_path.parent.mkdir(parents=True, exist_ok=True)
-                await context.storage_state(path=str(state_path))
-            slots = await adapter.search_slots()
-
-            selected = self._pick_slot(slots, job)
-            if not selected:
-                await self.notifier.send(f"[{job.name}] 조건에 맞는 자리 없음")
-                await browser.close()
+        key = self._search_key(job)
+        shared = await self.searches.lookup(key, job.name)
+        try:
+            await self._run_browser(job, shared)
+        finally:
+            self.searches.release(key, job.name)
+
+    async def _run_browser(self, job: JobConfig, shared: list[SlotResult] | None) -> None:
+        if shared is not None:
+            selected = await self._select(job, shared)
+            if not selected or self.runtime.dry_run:
                 return
+            self._slot_cache(job).mark_pending(selected.slot_id)
 
-            if self.runtime.dry_run:
-                await self.notifier.send(
-                    f"[{job.name}] DRY_RUN: 예약 가능 자리 발견 -> {selected.site_name} ({selected.zone})"
-                )
-                await browser.close()
+        # a pending booking (escalated or previously failed) preempts routine polls
+        priority = PRIORITY_BOOKING if self._slot_cache(job).has_pending else PRIORITY_POLL
+        async with self.admission.admit(job.name, priority):
+            if self._warm_enabled(job):
+                await self._run_warm(job)
                 return
 
-            ok = await adapter.book_slot(selected)
-            if ok:
-                await self.notifier.send(
-                    f"[{job.name}] 예약 성공: {selected.site_name} / {selected.check_in} / {selected.nights}박"
-                )
+            async with self.pool.context(**self._context_options(job)) as context:
+                adapter = await self._open_adapter(job, context)
+                try:
+                    async with self._traced(job, context):
+                        await self._ensure_login(job, adapter)
+                        await self._search_and_book(job, adapter)
+                finally:
+                    self._after_run(job, adapter)
+
+    async def _run_opening(self, job: JobConfig) -> None:
+        bell = job.opening
+        assert bell is not None
+        async with self.pool.context(**self._context_options(job)) as context:
+            adapter = await self._open_adapter(job, context)
+            try:
+                async with self._traced(job, context):
+                    await self._ensure_login(job, adapter)
+                    await adapter.prepare_for_opening()
+
+                    offset = await estimate_clock_offset(
+                        self._http_client(job), job.base_url, samples=bell.clock_samples
+                    )
+                    target = bell.open_at.timestamp()
+                    with span("opening_wait"):
+                        await sleep_until(offset.to_local(target))
+                    fired = time.time()
+                    await self._search_and_book(job, adapter, fresh=True)
+            finally:
+                self._after_run(job, adapter)
+
+        error_ms = (fired + offset.offset_seconds - target) * 1000
+        await self.notifier.send(
+            f"[{job.name}] 오픈 실행 완료: 목표 {bell.open_at.isoformat()}, 발사 오차 {error_ms:+.1f}ms "
+            f"(서버 시계 차 {offset.offset_seconds:+.3f}s ±{offset.uncertainty_seconds:.3f}s)"
+        )
+
+    async def _run_warm(self, job: JobConfig) -> None:
+        session = self._sessions.get(job.name)
+        if session and not session.is_usable():
+            await self._drop_session(job.name)
+            session = None
+
+        if session is None:
+            lease = await self.pool.lease(**self._context_options(job))
+            try:
+                adapter = await self._open_adapter(job, lease.context)
+            except BaseException:
+                await lease.release()
+                raise
+            session = _WarmSession(lease=lease, adapter=adapter)
+            self._sessions[job.name] = session
+
+        try:
+            async with self._traced(job, session.lease.context):
+                await self._ensure_login(job, session.adapter)
+                await self._search_and_book(job, session.adapter)
+        except BaseException:
+            await self._drop_session(job.name)
+            raise
+        finally:
+            self._after_run(job, session.adapter)
+
+        session.runs += 1
+        if session.runs >= self.runtime.browser_recycle_runs:
+            await self._drop_session(job.name)
+
+    async def _drop_session(self, name: str) -> None:
+        session = self._sessions.pop(name, None)
+        if session:
+            await session.lease.release()
+
+    def _after_run(self, job: JobConfig, adapter: SiteAdapter) -> None:
+        router = self.routers.get(job.name)
+        if router:
+            logger.info("[%s] 요청 차단 누계: %s", job.name, router.summary())
+
+        if not adapter.budget_hits:
+            return
+        self.budget_hits[job.name].update(adapter.budget_hits)
+        for step in adapter.budget_hits:
+            self.metrics.inc("camping_bot_budget_hits_total", job=job.name, step=step)
+        logger.warning("[%s] 대기 예산 초과 단계: %s", job.name, ", ".join(adapter.budget_hits))
+        adapter.budget_hits = []
+
+    @asynccontextmanager
+    async def _traced(self, job: JobConfig, context: BrowserContext) -> AsyncIterator[None]:
+        """Record a Playwright trace for the run; persist it only if the run raises."""
+        enabled = job.criteria.get("debug_trace", self.runtime.debug_trace)
+        if not (enabled and self.artifacts.enabled):
+            yield
+            return
+        try:
+            await context.tracing.start(snapshots=True, screenshots=False)
+        except Exception:
+            logger.debug("tracing start failed", exc_info=True)
+            yield
+            return
+
+        try:
+            yield
+        except Exception:
+            await self._stop_trace(job, context, keep=True)
+            raise
+        except BaseException:
+            # the run deadline cancels from outside this block; a timed-out run is a failure
+            deadline = current_deadline()
+            await self._stop_trace(job, context, keep=deadline is not None and deadline.expired())
+            raise
+        await self._stop_trace(job, context, keep=False)
+
+    async def _stop_trace(self, job: JobConfig, context: BrowserContext, keep: bool) -> None:
+        try:
+            if keep and self.artifacts.allow(job.name, "trace"):
+                path = self.artifacts.path_for(job.name, "failure", ".trace.zip")
+                await asyncio.to_thread(path.parent.mkdir, parents=True, exist_ok=True)
+                async with asyncio.timeout(self.pool.teardown_seconds):
+                    await context.tracing.stop(path=str(path))
+                self.artifacts.adopt(path)
+                logger.warning("[%s] 실패 실행 trace 저장: %s", job.name, path)
             else:
-                await self.notifier.send(f"[{job.name}] 예약 시도 실패")
+                async with asyncio.timeout(self.pool.teardown_seconds):
+                    await context.tracing.stop()
+        except Exception:
+            logger.debug("tracing stop failed", exc_info=True)
 
-            await browser.close()
+    def _router(self, job: JobConfig) -> RequestRouter | None:
+        routing = job.criteria.get("routing", self.runtime.request_blocking)
+        if not routing:
+            return None
+        router = self.routers.get(job.name)
+        if router is None:
+            profiles = self._plan(job).route_profiles
+            router = (
+                RequestRouter(dict(profiles), self.metrics, job.name)
+                if profiles is not None
+                else RequestRouter.from_criteria(routing, self.metrics, job.name)
+            )
+            self.routers[job.name] = router
+        return router
+
+    def _probe_enabled(self, job: JobConfig) -> bool:
+        if self.runtime.har_mode == "replay":
+            return False
+        return bool(job.criteria.get("http_probe", self.runtime.http_probe))
+
+    def _warm_enabled(self, job: JobConfig) -> bool:
+        # HAR files cover exactly one context, so record/replay always runs cold
+        if self.runtime.har_mode != "off":
+            return False
+        return bool(job.criteria.get("warm_session", self.runtime.warm_sessions))
+
+    def _context_options(self, job: JobConfig) -> dict[str, Any]:
+        options: dict[str, Any] = {}
+        state = self.sessions.get(self._session_key(job))
+        if state is not None:
+            options["storage_state"] = state
+        if self.runtime.har_mode == "record":
+            path, har_options = record_options(self.runtime.har_dir, job.name)
+            self._har_recordings[job.name] = path
+            options.update(har_options)
+        return options
+
+    def _session_key(self, job: JobConfig) -> SessionKey:
+        return (job.adapter, str(job.credentials.get("username", "")))
+
+    async def _open_adapter(self, job: JobConfig, context: BrowserContext) -> SiteAdapter:
+        adapter_cls = get_adapter(job.adapter)
+        router = self._router(job)
+        if router:
+            router.mode = "search"
+            await router.install(context)
+        if self.runtime.har_mode == "replay":
+            # registered after the router so recorded responses take precedence
+            har = find_replay_har(self.runtime.har_replay_path or self.runtime.har_dir, job.name)
+            if har is None:
+                raise ValueError(f"No HAR recording for job {job.name}")
+            await install_replay(context, har)
+        # on the context so extra stay tabs opened by search_stays get it too
+        context.set_default_timeout(self.runtime.timeout_ms)
+        page = await context.new_page()
+        adapter = adapter_cls(
+            page,
+            job.base_url,
+            job.credentials,
+            job.criteria,
+            self.runtime,
+            plan=self._plan(job),
+        )
+        adapter.selector_memory = self._selector_memory[job.name]
+        adapter.artifacts = self.artifacts
+        adapter.job_name = job.name
+        return adapter
+
+    async def _ensure_login(self, job: JobConfig, adapter: SiteAdapter) -> None:
+        """Log in unless the stored session is fresh and the page still shows a logged-in state."""
+        key = self._session_key(job)
+        age = self.sessions.age_seconds(key)
+        if age is not None:
+            self.metrics.gauge("camping_bot_session_age_seconds", age, job=job.name)
+        async with phase("login"):
+            if not self.sessions.refresh_due(key) and await adapter.is_logged_in():
+                return
+            await self._login(job, adapter)
+
+    async def _login(self, job: JobConfig, adapter: SiteAdapter) -> None:
+        with span("login"):
+            await adapter.login()
+        state = await adapter.page.context.storage_state()
+        key = self._session_key(job)
+        if await self.sessions.save(key, state):
+            self.metrics.inc("camping_bot_session_writes_total", job=job.name)
+        client = self._http.get(key)
+        if client is not None:
+            client.cookies.update(cookies_from_playwright(state.get("cookies", [])))
+
+    async def _search_and_book(
+        self, job: JobConfig, adapter: SiteAdapter, fresh: bool = False
+    ) -> None:
+        """Search (sharing with same-key jobs unless `fresh`), pick a slot and book it.
+
+        `fresh` searches on this adapter right away and publishes the result,
+        for the opening fire, which must never wait on or reuse another job's
+        pre-open search.
+        """
+        key = self._search_key(job)
+        async with phase("search"):
+            with span("search"):
+                if fresh:
+                    slots = await adapter.search_slots()
+                    self.searches.publish(key, job.name, slots)
+                else:
+                    slots = await self.searches.run(key, adapter.search_slots, job.name)
+
+        selected = await self._select(job, slots)
+        if not selected or self.runtime.dry_run:
+            return
+
+        cache = self._slot_cache(job)
+        router = self.routers.get(job.name)
+        if router:
+            router.mode = "book"
+        try:
+            async with phase("book"):
+                with span("book"):
+                    ok = await adapter.book_slot(selected)
+        except BaseException:
+            # outcome unknown (timeout, navigation error, ...); keep the slot pending so
+            # the next run retries it at booking priority instead of treating it as seen
+            cache.mark_pending(selected.slot_id)
+            raise
+        finally:
+            if router:
+                router.mode = "search"
+        if ok:
+            cache.clear_pending(selected.slot_id)
+            await self.notifier.send(
+                f"[{job.name}] 예약 성공: {selected.site_name} / {selected.check_in} / {selected.nights}박"
+            )
+        else:
+            cache.mark_pending(selected.slot_id)
+            await self.notifier.send(f"[{job.name}] 예약 시도 실패", coalesce=True)
+
+    async def _select(self, job: JobConfig, slots: list[SlotResult]) -> SlotResult | None:
+        """Diff against the previous poll, report changes and pick among new slots."""
+        with span("pick"):
+            changes = self._slot_cache(job).observe(slots)
+            self.history.record(job.name, changes)
+            self.poll_states[job.name].record(changes.changed)
+            selected = self._pick_slot(changes.bookable(), job)
+
+        if changes.appeared:
+            names = ", ".join(slot.site_name for slot in changes.appeared)
+            await self.notifier.send(f"[{job.name}] 새 자리 {len(changes.appeared)}개: {names}")
+        if changes.disappeared:
+            names = ", ".join(slot.site_name for slot in changes.disappeared)
+            await self.notifier.send(f"[{job.name}] 자리 사라짐: {names}")
+
+        if not selected:
+            if not slots:
+                logger.info("[%s] 조건에 맞는 자리 없음", job.name)
+            return None
+
+        if self.runtime.dry_run:
+            await self.notifier.send(
+                f"[{job.name}] DRY_RUN: 예약 가능 자리 발견 -> {selected.site_name} ({selected.zone})"
+            )
+        return selected
+
+    def _slot_cache(self, job: JobConfig) -> SlotCache:
+        cache = self._slot_caches.get(job.name)
+        if cache is None:
+            cache = SlotCache(self.runtime.slot_cache_ttl_seconds, self.runtime.slot_cache_max_size)
+            self._slot_caches[job.name] = cache
+        return cache
+
+    def _plan(self, job: JobConfig) -> JobPlan:
+        if job.plan is None:
+            job.plan = compile_job(job)
+        return job.plan
+
+    def _search_key(self, job: JobConfig) -> SearchKey:
+        adapter_cls = get_adapter(job.adapter)
+        return search_key(job, adapter_cls.search_criteria_keys)
 
     def _pick_slot(self, slots: list[SlotResult], job: JobConfig) -> SlotResult | None:
         if not slots:
             return None
 
-        guests = int(job.criteria.get("guests", 1))
-        preferred_zones = set(job.criteria.get("preferred_zones", []))
+        plan = self._plan(job)
+        preferred_zones = plan.preferred_zones
+        rank = plan.site_rank
 
-        candidates = [slot for slot in slots if slot.capacity >= guests]
+        candidates = [slot for slot in slots if slot.capacity >= plan.guests]
+        if rank:
+            candidates = sorted(
+                (slot for slot in candidates if slot.site_name in rank),
+                key=lambda slot: rank[slot.site_name],
+            )
         if preferred_zones:
             preferred = [slot for slot in candidates if slot.zone in preferred_zones]
             if preferred:
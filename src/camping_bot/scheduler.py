@@ -1,27 +1,239 @@
 ﻿from __future__ import annotations
 
+import asyncio
+import logging
+import os
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Any, Coroutine
+
 from apscheduler.schedulers.asyncio import AsyncIOScheduler
 
-from camping_bot.models import JobConfig
+from camping_bot.adaptive_trigger import AdaptiveTrigger
+from camping_bot.config import commit_adapters, read_config
+from camping_bot.metrics import serve_metrics
+from camping_bot.models import JobConfig, RuntimeConfig
+from camping_bot.notifier import Notifier
 from camping_bot.runner import JobRunner
+from camping_bot.watchdog import LoopWatchdog
+
+logger = logging.getLogger(__name__)
 
 
 def build_scheduler(runner: JobRunner, jobs: list[JobConfig]) -> AsyncIOScheduler:
     scheduler = AsyncIOScheduler()
-
     for job in jobs:
-        if not job.enabled:
-            continue
+        schedule_job(scheduler, runner, job)
+    return scheduler
+
+
+def poll_trigger(runner: JobRunner, job: JobConfig) -> AdaptiveTrigger:
+    state = runner.poll_states[job.name]
+    if job.polling:
+        return AdaptiveTrigger(job.polling, state)
+    return AdaptiveTrigger.fixed(job.interval_seconds, state)
+
+
+def schedule_job(scheduler: AsyncIOScheduler, runner: JobRunner, job: JobConfig) -> None:
+    if not job.enabled:
+        return
+    scheduler.add_job(
+        runner.run_once,
+        poll_trigger(runner, job),
+        args=[job],
+        id=job.name,
+        # a tick that lands on an in-flight run must still reach run_once, which
+        # skips it (and cancels the run once it is stuck past its deadline)
+        max_instances=2,
+        coalesce=True,
+        misfire_grace_time=5,
+    )
+    if job.opening and job.opening.open_at > datetime.now(job.opening.open_at.tzinfo):
+        prewarm = job.opening.prewarm_seconds
         scheduler.add_job(
-            runner.run_once,
-            "interval",
+            runner.run_opening,
+            "date",
             args=[job],
-            seconds=job.interval_seconds,
-            id=job.name,
-            max_instances=1,
-            coalesce=True,
-            misfire_grace_time=5,
+            run_date=job.opening.open_at - timedelta(seconds=prewarm),
+            id=opening_job_id(job.name),
+            misfire_grace_time=max(1, int(prewarm)),
         )
 
-    return scheduler
 
+def unschedule_job(scheduler: AsyncIOScheduler, name: str) -> None:
+    """Remove a job's triggers; a run already in flight finishes undisturbed."""
+    for job_id in (name, opening_job_id(name)):
+        if scheduler.get_job(job_id) is not None:
+            scheduler.remove_job(job_id)
+
+
+def opening_job_id(name: str) -> str:
+    return f"{name}:opening"
+
+
+@dataclass
+class JobDiff:
+    added: list[JobConfig] = field(default_factory=list)
+    removed: list[JobConfig] = field(default_factory=list)
+    changed: list[tuple[JobConfig, JobConfig]] = field(default_factory=list)
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.changed)
+
+    def summary(self) -> str:
+        parts = [
+            f"추가 {', '.join(job.name for job in self.added) or '-'}",
+            f"삭제 {', '.join(job.name for job in self.removed) or '-'}",
+            f"변경 {', '.join(new.name for _, new in self.changed) or '-'}",
+        ]
+        return " / ".join(parts)
+
+
+def diff_jobs(current: dict[str, JobConfig], jobs: list[JobConfig]) -> JobDiff:
+    incoming = {job.name: job for job in jobs}
+    diff = JobDiff()
+    for name, job in incoming.items():
+        old = current.get(name)
+        if old is None:
+            diff.added.append(job)
+        elif old != job:
+            diff.changed.append((old, job))
+    diff.removed = [job for name, job in current.items() if name not in incoming]
+    return diff
+
+
+class ConfigReloader:
+    """Watch the YAML config and apply changed jobs to a running scheduler.
+
+    A reload is parsed and validated (including building every new trigger)
+    before anything is touched, so a bad edit is rejected as a whole and the
+    previous jobs keep running. Unchanged jobs keep their schedule, warm
+    session and slot memory; runs already in flight finish with the config
+    they started with.
+    """
+
+    def __init__(
+        self,
+        config_path: str,
+        scheduler: AsyncIOScheduler,
+        runner: JobRunner,
+        notifier: Notifier,
+        jobs: list[JobConfig],
+    ) -> None:
+        self.config_path = config_path
+        self.scheduler = scheduler
+        self.runner = runner
+        self.notifier = notifier
+        self.jobs = {job.name: job for job in jobs}
+        self._signature = self._stat()
+        self._pending: set[asyncio.Task] = set()
+
+    async def watch(self, interval_seconds: float) -> None:
+        while True:
+            await asyncio.sleep(interval_seconds)
+            signature = self._stat()
+            if signature is None or signature == self._signature:
+                continue
+            self._signature = signature
+            await self.reload()
+
+    async def reload(self) -> JobDiff | None:
+        try:
+            jobs, adapters = await asyncio.to_thread(read_config, self.config_path)
+            diff = diff_jobs(self.jobs, jobs)
+            for job in [*diff.added, *(new for _, new in diff.changed)]:
+                if job.enabled:
+                    poll_trigger(self.runner, job)
+        except Exception as exc:
+            logger.error("설정 다시 읽기 실패, 기존 설정 유지: %s", exc)
+            await self.notifier.send(f"설정 다시 읽기 거부(기존 설정 유지): {exc}", coalesce=True)
+            return None
+
+        # adapter registrations change only together with an accepted config
+        commit_adapters(adapters)
+
+        if diff:
+            self._apply(diff)
+            await self.notifier.send(f"설정 다시 읽음: {diff.summary()}")
+        return diff
+
+    def _apply(self, diff: JobDiff) -> None:
+        for job in diff.removed:
+            unschedule_job(self.scheduler, job.name)
+            self._spawn(self.runner.retire_job(job.name))
+            del self.jobs[job.name]
+
+        for job in diff.added:
+            schedule_job(self.scheduler, self.runner, job)
+            self.jobs[job.name] = job
+
+        for old, new in diff.changed:
+            if _schedule_fields(old) != _schedule_fields(new):
+                unschedule_job(self.scheduler, old.name)
+                schedule_job(self.scheduler, self.runner, new)
+            else:
+                for job_id in (new.name, opening_job_id(new.name)):
+                    if self.scheduler.get_job(job_id) is not None:
+                        self.scheduler.modify_job(job_id, args=[new])
+            self._spawn(self.runner.reconfigure_job(old, new))
+            self.jobs[new.name] = new
+
+    def _spawn(self, coro: Coroutine[Any, Any, None]) -> None:
+        task = asyncio.create_task(coro)
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+
+    def _stat(self) -> tuple[int, int] | None:
+        try:
+            stat = os.stat(self.config_path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+
+def _schedule_fields(job: JobConfig) -> tuple:
+    return job.enabled, job.interval_seconds, job.polling, job.opening
+
+
+async def serve_jobs(
+    runtime: RuntimeConfig,
+    notifier: Notifier,
+    jobs: list[JobConfig],
+    runner: JobRunner | None = None,
+    config_path: str | None = None,
+) -> None:
+    """Schedule `jobs` and run until cancelled, then release browsers.
+
+    With `config_path` and CONFIG_RELOAD_SECONDS > 0 the file is watched and
+    changes are applied to the running scheduler.
+    """
+    runner = runner or JobRunner(runtime, notifier)
+    metrics_server = None
+    if runtime.metrics_port:
+        metrics_server = await serve_metrics(
+            runner.metrics, runtime.metrics_host, runtime.metrics_port
+        )
+    loop_watchdog = None
+    if runtime.loop_stall_seconds > 0:
+        loop_watchdog = LoopWatchdog(runner.metrics, runtime.loop_stall_seconds)
+        loop_watchdog.start()
+    scheduler = build_scheduler(runner, jobs)
+    scheduler.start()
+    watcher = None
+    if config_path and runtime.config_reload_seconds > 0:
+        reloader = ConfigReloader(config_path, scheduler, runner, notifier, jobs)
+        watcher = asyncio.create_task(
+            reloader.watch(runtime.config_reload_seconds), name="config-reload"
+        )
+    try:
+        while True:
+            await asyncio.sleep(3600)
+    finally:
+        if watcher is not None:
+            watcher.cancel()
+        scheduler.shutdown(wait=False)
+        if metrics_server is not None:
+            metrics_server.close()
+        await runner.close()
+        if loop_watchdog is not None:
+            loop_watchdog.stop()
@@ -0,0 +1,112 @@
+﻿from __future__ import annotations
+
+import asyncio
+import json
+import time
+from typing import Awaitable, Callable
+
+from camping_bot.models import JobConfig, SlotResult
+
+SearchKey = tuple[str, str, str, str]
+
+
+def search_key(job: JobConfig, criteria_keys: tuple[str, ...]) -> SearchKey:
+    """Jobs with equal keys would get identical search_slots() results."""
+    relevant = {key: job.criteria.get(key) for key in criteria_keys}
+    return (
+        job.adapter,
+        job.base_url,
+        str(job.credentials.get("username", "")),
+        json.dumps(relevant, sort_keys=True, default=str, ensure_ascii=False),
+    )
+
+
+class SharedSearchCache:
+    """Single-flight search results shared by jobs with the same search key.
+
+    The first job to `lookup` a key claims it before doing any browser work;
+    jobs that tick while the claim is open await the claimant's result instead
+    of opening their own browser. Finished results are reused for
+    `ttl_seconds` so slightly skewed ticks of *other* jobs still share one
+    search; a job never gets its own result back, so its poll rate is set by
+    its trigger, not by the TTL. If the
+    claimant fails, is cancelled or never searches, waiters get None and fall
+    back to their own search.
+    """
+
+    def __init__(self, ttl_seconds: float) -> None:
+        self._ttl = ttl_seconds
+        self._inflight: dict[SearchKey, tuple[str, asyncio.Future[list[SlotResult]]]] = {}
+        self._results: dict[SearchKey, tuple[float, str, list[SlotResult]]] = {}
+
+    async def lookup(self, key: SearchKey, owner: str) -> list[SlotResult] | None:
+        """Return a shared result for `key`, or None after claiming the key for `owner`."""
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight[0] != owner:
+            return await self._join(inflight[1])
+
+        cached = self._results.get(key)
+        if cached and cached[1] != owner and time.monotonic() - cached[0] < self._ttl:
+            return list(cached[2])
+
+        if inflight is None:
+            self._inflight[key] = (owner, asyncio.get_running_loop().create_future())
+        return None
+
+    def release(self, key: SearchKey, owner: str) -> None:
+        """Drop `owner`'s claim on `key` if it ended without publishing a result."""
+        inflight = self._inflight.get(key)
+        if inflight is None or inflight[0] != owner:
+            return
+        del self._inflight[key]
+        self._fail(inflight[1], RuntimeError("shared search abandoned"))
+
+    async def run(
+        self,
+        key: SearchKey,
+        search: Callable[[], Awaitable[list[SlotResult]]],
+        owner: str,
+    ) -> list[SlotResult]:
+        inflight = self._inflight.get(key)
+        if inflight is not None and inflight[0] != owner:
+            joined = await self._join(inflight[1])
+            if joined is not None:
+                return joined
+            inflight = self._inflight.get(key)
+
+        if inflight is not None and inflight[0] == owner:
+            future = inflight[1]
+        else:
+            future = asyncio.get_running_loop().create_future()
+            self._inflight.setdefault(key, (owner, future))
+        try:
+            slots = await search()
+        except BaseException as exc:
+            # waiters must see a plain failure, never CancelledError, so they fall back
+            self._fail(future, exc if isinstance(exc, Exception) else RuntimeError("shared search cancelled"))
+            raise
+        else:
+            if not future.done():
+                future.set_result(slots)
+            self._results[key] = (time.monotonic(), owner, slots)
+            return list(slots)
+        finally:
+            if self._inflight.get(key, (None, None))[1] is future:
+                del self._inflight[key]
+
+    def publish(self, key: SearchKey, owner: str, slots: list[SlotResult]) -> None:
+        """Offer a search `owner` ran outside `run` (not joined to any claim) to other jobs."""
+        self._results[key] = (time.monotonic(), owner, list(slots))
+
+    @staticmethod
+    async def _join(future: asyncio.Future[list[SlotResult]]) -> list[SlotResult] | None:
+        try:
+            return list(await asyncio.shield(future))
+        except Exception:
+            return None
+
+    @staticmethod
+    def _fail(future: asyncio.Future[list[SlotResult]], exc: Exception) -> None:
+        if not future.done():
+            future.set_exception(exc)
+            future.exception()
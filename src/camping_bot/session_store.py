@@ -0,0 +1,125 @@
+﻿from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import re
+import tempfile
+import time
+from collections import defaultdict
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any
+
+logger = logging.getLogger(__name__)
+
+SessionKey = tuple[str, str]
+
+
+@dataclass
+class _StoredSession:
+    state: dict[str, Any] | None
+    fingerprint: str
+    refreshed_at: float
+
+
+class SessionStore:
+    """Playwright storage states kept in memory per adapter+username.
+
+    Each account gets its own file next to `storage_state_path`
+    (`storage_state.<adapter>.<username>.json`), loaded lazily on first use.
+    A save only touches disk when the state actually changed, via temp file +
+    rename, so readers never see a half-written file. The legacy shared file
+    seeds accounts that have no file of their own yet.
+    """
+
+    def __init__(self, storage_state_path: str | None, max_age_seconds: float = 0.0) -> None:
+        self._legacy = Path(storage_state_path) if storage_state_path else None
+        self._max_age = max_age_seconds
+        self._sessions: dict[SessionKey, _StoredSession] = {}
+        self._locks: dict[SessionKey, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    def path_for(self, key: SessionKey) -> Path | None:
+        if self._legacy is None:
+            return None
+        adapter, username = key
+        slug = re.sub(r"[^0-9A-Za-z._-]+", "_", username) or "default"
+        return self._legacy.with_name(f"{self._legacy.stem}.{adapter}.{slug}{self._legacy.suffix}")
+
+    def get(self, key: SessionKey) -> dict[str, Any] | None:
+        return self._entry(key).state
+
+    def age_seconds(self, key: SessionKey) -> float | None:
+        entry = self._entry(key)
+        if entry.state is None:
+            return None
+        return max(0.0, time.time() - entry.refreshed_at)
+
+    def refresh_due(self, key: SessionKey) -> bool:
+        """True when there is no stored session or it is older than the max age."""
+        age = self.age_seconds(key)
+        if age is None:
+            return True
+        return self._max_age > 0 and age >= self._max_age
+
+    async def save(self, key: SessionKey, state: dict[str, Any]) -> bool:
+        """Record a fresh login; returns True if the state changed and was written."""
+        async with self._locks[key]:
+            entry = self._entry(key)
+            fingerprint = _fingerprint(state)
+            now = time.time()
+            if fingerprint == entry.fingerprint:
+                entry.refreshed_at = now
+                return False
+
+            path = self.path_for(key)
+            if path is not None:
+                await asyncio.to_thread(_write_atomic, path, state)
+            self._sessions[key] = _StoredSession(state, fingerprint, now)
+            return True
+
+    def _entry(self, key: SessionKey) -> _StoredSession:
+        entry = self._sessions.get(key)
+        if entry is None:
+            entry = self._load(key)
+            self._sessions[key] = entry
+        return entry
+
+    def _load(self, key: SessionKey) -> _StoredSession:
+        for path in (self.path_for(key), self._legacy):
+            if path is None or not path.exists():
+                continue
+            try:
+                state = json.loads(path.read_text(encoding="utf-8"))
+                refreshed_at = path.stat().st_mtime
+            except (OSError, ValueError):
+                logger.warning("storage state 파싱 실패: %s", path)
+                continue
+            # a seed from the legacy file is written to the per-account path on the next change
+            fingerprint = _fingerprint(state) if path != self._legacy else ""
+            return _StoredSession(state, fingerprint, refreshed_at)
+        return _StoredSession(None, "", 0.0)
+
+
+def _fingerprint(state: dict[str, Any]) -> str:
+    payload = json.dumps(state, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _write_atomic(path: Path, state: dict[str, Any]) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as handle:
+            json.dump(state, handle, ensure_ascii=False)
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except OSError:
+            pass
+        raise
@@ -4,6 +4,7 @@ import os
 
 from dotenv import load_dotenv
 
+from camping_bot.har import HAR_MODES
 from camping_bot.models import RuntimeConfig
 
 
@@ -13,6 +14,13 @@ def _to_bool(value: str | None, default: bool) -> bool:
     return value.strip().lower() in {"1", "true", "yes", "on"}
 
 
+def _har_mode(value: str | None) -> str:
+    mode = (value or "off").strip().lower()
+    if mode not in HAR_MODES:
+        raise ValueError(f"HAR_MODE must be one of {', '.join(HAR_MODES)}: {value}")
+    return mode
+
+
 def load_runtime_config() -> RuntimeConfig:
     load_dotenv()
     return RuntimeConfig(
@@ -21,7 +29,40 @@ def load_runtime_config() -> RuntimeConfig:
         timeout_ms=int(os.getenv("TIMEOUT_MS", "15000")),
         captcha_mode=os.getenv("CAPTCHA_MODE", "manual").strip().lower(),
         storage_state_path=(os.getenv("STORAGE_STATE_PATH") or "cfg/storage_state.json"),
+        session_max_age_seconds=float(os.getenv("SESSION_MAX_AGE_SECONDS", "0")),
         telegram_bot_token=os.getenv("TELEGRAM_BOT_TOKEN") or None,
         telegram_chat_id=os.getenv("TELEGRAM_CHAT_ID") or None,
+        telegram_api_base=os.getenv("TELEGRAM_API_BASE") or "https://api.telegram.org",
+        notify_dedup_seconds=float(os.getenv("NOTIFY_DEDUP_SECONDS", "600")),
+        notify_batch_seconds=float(os.getenv("NOTIFY_BATCH_SECONDS", "2")),
+        shared_search_ttl_seconds=float(os.getenv("SHARED_SEARCH_TTL_SECONDS", "5")),
+        slot_cache_ttl_seconds=float(os.getenv("SLOT_CACHE_TTL_SECONDS", "3600")),
+        slot_cache_max_size=int(os.getenv("SLOT_CACHE_MAX_SIZE", "5000")),
+        request_blocking=_to_bool(os.getenv("REQUEST_BLOCKING"), False),
+        config_reload_seconds=float(os.getenv("CONFIG_RELOAD_SECONDS", "2")),
+        metrics_host=os.getenv("METRICS_HOST", "127.0.0.1"),
+        metrics_port=int(os.getenv("METRICS_PORT", "0")),
+        timing_log_path=os.getenv("TIMING_LOG_PATH", "logs/timings.jsonl") or None,
+        max_concurrent_sessions=int(os.getenv("MAX_CONCURRENT_SESSIONS", "4")),
+        booking_reserved_sessions=int(os.getenv("BOOKING_RESERVED_SESSIONS", "1")),
+        admission_min_free_mb=int(os.getenv("ADMISSION_MIN_FREE_MB", "0")),
+        debug_artifacts_dir=os.getenv("DEBUG_ARTIFACTS_DIR", "logs/debug") or None,
+        debug_max_files=int(os.getenv("DEBUG_MAX_FILES", "200")),
+        debug_max_mb=int(os.getenv("DEBUG_MAX_MB", "200")),
+        debug_min_interval_seconds=float(os.getenv("DEBUG_MIN_INTERVAL_SECONDS", "60")),
+        debug_trace=_to_bool(os.getenv("DEBUG_TRACE"), False),
+        har_mode=_har_mode(os.getenv("HAR_MODE")),
+        har_dir=os.getenv("HAR_DIR") or "logs/har",
+        har_replay_path=os.getenv("HAR_REPLAY_PATH") or None,
+        history_db_path=os.getenv("HISTORY_DB_PATH", "logs/history.sqlite3") or None,
+        history_retention_days=float(os.getenv("HISTORY_RETENTION_DAYS", "90")),
+        history_flush_seconds=float(os.getenv("HISTORY_FLUSH_SECONDS", "30")),
+        run_deadline_seconds=float(os.getenv("RUN_DEADLINE_SECONDS", "180")),
+        teardown_timeout_seconds=float(os.getenv("TEARDOWN_TIMEOUT_SECONDS", "10")),
+        loop_stall_seconds=float(os.getenv("LOOP_STALL_SECONDS", "1")),
+        browser_pool_size=int(os.getenv("BROWSER_POOL_SIZE", "2")),
+        browser_recycle_runs=int(os.getenv("BROWSER_RECYCLE_RUNS", "50")),
+        warm_sessions=_to_bool(os.getenv("WARM_SESSIONS"), False),
+        http_probe=_to_bool(os.getenv("HTTP_PROBE"), False),
     )
 
@@ -0,0 +1,102 @@
+﻿from __future__ import annotations
+
+import logging
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+
+from camping_bot.models import SlotResult
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SlotChanges:
+    appeared: list[SlotResult] = field(default_factory=list)
+    disappeared: list[SlotResult] = field(default_factory=list)
+    unchanged: list[SlotResult] = field(default_factory=list)
+    pending: list[SlotResult] = field(default_factory=list)
+    # first poll after the cache started empty (restart, reload, TTL expiry):
+    # `appeared` is everything listed, not slots that actually just opened up
+    baseline: bool = False
+
+    @property
+    def changed(self) -> bool:
+        return bool(self.appeared or self.disappeared)
+
+    def bookable(self) -> list[SlotResult]:
+        """Newly appeared slots plus slots whose booking is still pending."""
+        seen = {slot.slot_id for slot in self.appeared}
+        return self.appeared + [slot for slot in self.pending if slot.slot_id not in seen]
+
+
+class SlotCache:
+    """Per-job memory of the previous poll, keyed by SlotResult.slot_id.
+
+    Entries older than `ttl_seconds` are treated as unseen, so a job that has
+    not polled for a while reports its slots as new again. Every poll is
+    diffed in full; `max_size` only bounds how many slots are remembered, so
+    slots past it keep showing up as new instead of being dropped.
+    """
+
+    def __init__(self, ttl_seconds: float, max_size: int) -> None:
+        self._ttl = ttl_seconds
+        self._max_size = max(1, max_size)
+        self._entries: OrderedDict[str, tuple[float, SlotResult]] = OrderedDict()
+        self._pending: set[str] = set()
+        self._primed = False
+        self._warned_size = False
+
+    def observe(self, slots: list[SlotResult]) -> SlotChanges:
+        now = time.monotonic()
+        self._expire(now)
+
+        current: OrderedDict[str, SlotResult] = OrderedDict()
+        for slot in slots:
+            current.setdefault(slot.slot_id, slot)
+
+        changes = SlotChanges(baseline=not self._primed)
+        self._primed = True
+        for slot_id, slot in current.items():
+            previous = self._entries.get(slot_id)
+            if previous and previous[1] == slot:
+                changes.unchanged.append(slot)
+            else:
+                changes.appeared.append(slot)
+        changes.disappeared = [
+            slot for slot_id, (_, slot) in self._entries.items() if slot_id not in current
+        ]
+
+        if len(current) > self._max_size and not self._warned_size:
+            self._warned_size = True
+            logger.warning(
+                "조회 결과 %d건이 SLOT_CACHE_MAX_SIZE(%d)를 넘어 일부는 매번 새 자리로 취급",
+                len(current),
+                self._max_size,
+            )
+        self._entries = OrderedDict(
+            (slot_id, (now, slot))
+            for slot_id, slot in list(current.items())[: self._max_size]
+        )
+        self._pending &= current.keys()
+        changes.pending = [current[slot_id] for slot_id in self._pending]
+        return changes
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def mark_pending(self, slot_id: str) -> None:
+        """Keep a still-listed slot bookable on the next poll (e.g. after a failed attempt)."""
+        self._pending.add(slot_id)
+
+    def clear_pending(self, slot_id: str) -> None:
+        self._pending.discard(slot_id)
+
+    def _expire(self, now: float) -> None:
+        if not self._entries:
+            return
+        if now - next(iter(self._entries.values()))[0] >= self._ttl:
+            self._entries.clear()
+            self._pending.clear()
+            self._primed = False
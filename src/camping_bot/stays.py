@@ -0,0 +1,86 @@
+﻿from __future__ import annotations
+
+from datetime import date, timedelta
+from typing import Any
+
+from camping_bot.models import Stay
+
+WEEKDAYS = ("mon", "tue", "wed", "thu", "fri", "sat", "sun")
+MAX_STAYS = 62
+
+
+def expand_stays(criteria: dict) -> list[Stay]:
+    """Expand criteria.check_in / criteria.nights into concrete (check_in, nights) options.
+
+    check_in may be a date string, a list of them, or a range
+    `{from, to, weekdays}`; nights may be an int or a list. Order is kept so
+    earlier options rank first.
+    """
+    check_ins = _expand_check_ins(criteria.get("check_in"))
+    nights_options = _expand_nights(criteria.get("nights", 1))
+    combos = (Stay(check_in, nights) for check_in in check_ins for nights in nights_options)
+    stays = list(dict.fromkeys(combos))
+    if not stays:
+        raise ValueError(f"criteria.check_in matches no dates: {criteria.get('check_in')!r}")
+    if len(stays) > MAX_STAYS:
+        raise ValueError(f"Too many check_in/nights combinations: {len(stays)} > {MAX_STAYS}")
+    return stays
+
+
+def is_multi_stay(criteria: dict) -> bool:
+    return isinstance(criteria.get("check_in"), (list, dict)) or isinstance(criteria.get("nights"), list)
+
+
+def _expand_check_ins(value: Any) -> list[str | None]:
+    if value is None or value == "":
+        return [None]
+    if isinstance(value, list):
+        return [day for item in value for day in _expand_check_ins(item)]
+    if isinstance(value, dict):
+        return _expand_range(value)
+    return [_parse_date(value).isoformat()]
+
+
+def _expand_range(spec: dict) -> list[str | None]:
+    start = _parse_date(spec.get("from"))
+    end = _parse_date(spec.get("to", spec.get("from")))
+    if end < start:
+        raise ValueError(f"check_in range ends before it starts: {start} > {end}")
+
+    weekdays = spec.get("weekdays")
+    allowed = {_parse_weekday(day) for day in weekdays} if weekdays else set(range(7))
+    days: list[str | None] = []
+    current = start
+    while current <= end:
+        if current.weekday() in allowed:
+            days.append(current.isoformat())
+        current += timedelta(days=1)
+    return days
+
+
+def _expand_nights(value: Any) -> list[int]:
+    values = value if isinstance(value, list) else [value]
+    nights = [int(item) for item in values]
+    if not nights or any(n < 1 for n in nights):
+        raise ValueError(f"Invalid nights: {value!r}")
+    return nights
+
+
+def _parse_date(value: Any) -> date:
+    if isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(str(value).strip())
+    except ValueError as exc:
+        raise ValueError(f"Invalid check_in date: {value!r}") from exc
+
+
+def _parse_weekday(value: Any) -> int:
+    if isinstance(value, int):
+        if 0 <= value <= 6:
+            return value
+    else:
+        key = str(value).strip().lower()[:3]
+        if key in WEEKDAYS:
+            return WEEKDAYS.index(key)
+    raise ValueError(f"Invalid weekday: {value!r} (use mon..sun or 0..6)")
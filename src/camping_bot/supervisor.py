@@ -0,0 +1,213 @@
+﻿from __future__ import annotations
+
+import asyncio
+import logging
+import multiprocessing as mp
+import queue
+import signal
+import time
+from dataclasses import dataclass, field, replace
+from multiprocessing.process import BaseProcess
+from typing import Any
+
+from camping_bot.adapters.registry import configured_adapters, get_adapter, register_adapter
+from camping_bot.models import JobConfig, RuntimeConfig
+from camping_bot.notifier import Notifier
+from camping_bot.runner import JobRunner
+from camping_bot.scheduler import serve_jobs
+from camping_bot.search_share import search_key
+from camping_bot.settings import load_runtime_config
+
+logger = logging.getLogger(__name__)
+
+STATUS_INTERVAL_SECONDS = 15
+STATUS_LOG_INTERVAL_SECONDS = 60
+MAX_RESTART_BACKOFF_SECONDS = 60
+
+
+def partition_jobs(jobs: list[JobConfig], workers: int) -> list[list[JobConfig]]:
+    """Split enabled jobs into `workers` shards.
+
+    Jobs sharing a search key stay on one worker so they keep sharing
+    searches; groups are placed largest-first onto the least-loaded shard.
+    """
+    groups: dict[Any, list[JobConfig]] = {}
+    for job in jobs:
+        if not job.enabled:
+            continue
+        key = search_key(job, get_adapter(job.adapter).search_criteria_keys)
+        groups.setdefault(key, []).append(job)
+
+    shards: list[list[JobConfig]] = [[] for _ in range(max(1, workers))]
+    for group in sorted(groups.values(), key=len, reverse=True):
+        min(shards, key=len).extend(group)
+    return [shard for shard in shards if shard]
+
+
+class ForwardingNotifier(Notifier):
+    """Worker-side notifier: hands messages to the supervisor's single Notifier."""
+
+    def __init__(self, runtime: RuntimeConfig, events: Any, worker_id: int) -> None:
+        super().__init__(runtime)
+        self._events = events
+        self._worker_id = worker_id
+
+    async def send(self, message: str, coalesce: bool = False) -> None:
+        self._events.put(("notify", self._worker_id, (message, coalesce)))
+
+    async def close(self, timeout: float = 10.0) -> None:
+        _ = timeout
+
+
+def _worker_main(
+    worker_id: int, jobs: list[JobConfig], events: Any, adapters: dict[str, str]
+) -> None:
+    logging.basicConfig(
+        level=logging.INFO,
+        format=f"%(asctime)s [%(levelname)s] w{worker_id} %(name)s: %(message)s",
+    )
+    # spawned workers start with an empty registry; repeat the config's `adapters:` entries
+    for name, target in adapters.items():
+        register_adapter(name, target)
+    asyncio.run(_worker_serve(worker_id, jobs, events))
+
+
+async def _worker_serve(worker_id: int, jobs: list[JobConfig], events: Any) -> None:
+    runtime = load_runtime_config()
+    if runtime.metrics_port:
+        runtime.metrics_port += 1 + worker_id
+    notifier = ForwardingNotifier(runtime, events, worker_id)
+    runner = JobRunner(runtime, notifier)
+
+    task = asyncio.current_task()
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, task.cancel)
+    except (NotImplementedError, RuntimeError):
+        pass
+
+    async def report_status() -> None:
+        while True:
+            events.put(("status", worker_id, runner.status()))
+            await asyncio.sleep(STATUS_INTERVAL_SECONDS)
+
+    reporter = asyncio.create_task(report_status())
+    try:
+        await serve_jobs(runtime, notifier, jobs, runner=runner)
+    except asyncio.CancelledError:
+        pass
+    finally:
+        reporter.cancel()
+
+
+@dataclass
+class _Worker:
+    worker_id: int
+    jobs: list[JobConfig]
+    process: BaseProcess | None = None
+    restarts: int = 0
+    next_start: float = 0.0
+    status: dict[str, Any] = field(default_factory=dict)
+
+
+class Supervisor:
+    """Runs job shards in separate processes, restarts crashed workers and
+    funnels their notifications through one Notifier."""
+
+    def __init__(self, runtime: RuntimeConfig, notifier: Notifier, jobs: list[JobConfig], workers: int) -> None:
+        self.runtime = runtime
+        self.notifier = notifier
+        self._ctx = mp.get_context("spawn")
+        self._events = self._ctx.Queue()
+        self._workers = [
+            _Worker(worker_id=idx, jobs=shard)
+            for idx, shard in enumerate(partition_jobs(jobs, workers))
+        ]
+
+    async def run(self) -> None:
+        pump = asyncio.create_task(self._pump_events())
+        last_status_log = time.monotonic()
+        try:
+            while True:
+                now = time.monotonic()
+                for worker in self._workers:
+                    await self._check_worker(worker, now)
+                if now - last_status_log >= STATUS_LOG_INTERVAL_SECONDS:
+                    self._log_status()
+                    last_status_log = now
+                await asyncio.sleep(1)
+        finally:
+            pump.cancel()
+            await asyncio.to_thread(self._stop_all)
+
+    async def _check_worker(self, worker: _Worker, now: float) -> None:
+        proc = worker.process
+        if proc is not None and proc.is_alive():
+            return
+
+        if proc is not None:
+            code = proc.exitcode
+            worker.process = None
+            worker.restarts += 1
+            backoff = min(2 ** worker.restarts, MAX_RESTART_BACKOFF_SECONDS)
+            worker.next_start = now + backoff
+            await self.notifier.send(
+                f"[supervisor] 워커 {worker.worker_id} 종료(code={code}), {backoff}초 후 재시작",
+                coalesce=True,
+            )
+            return
+
+        if now < worker.next_start:
+            return
+        # compiled plans hold read-only mappings that do not pickle; workers recompile them
+        jobs = [replace(job, plan=None) for job in worker.jobs]
+        worker.process = self._ctx.Process(
+            target=_worker_main,
+            args=(worker.worker_id, jobs, self._events, configured_adapters()),
+            name=f"camping-bot-worker-{worker.worker_id}",
+            daemon=True,
+        )
+        worker.process.start()
+        logger.info(
+            "워커 %d 시작 pid=%s jobs=%s",
+            worker.worker_id,
+            worker.process.pid,
+            [job.name for job in worker.jobs],
+        )
+
+    async def _pump_events(self) -> None:
+        while True:
+            try:
+                kind, worker_id, payload = await asyncio.to_thread(self._events.get, True, 0.5)
+            except queue.Empty:
+                continue
+            if kind == "notify":
+                message, coalesce = payload
+                await self.notifier.send(message, coalesce=coalesce)
+            elif kind == "status":
+                self._workers[worker_id].status = payload
+
+    def status(self) -> list[dict[str, Any]]:
+        return [
+            {
+                "worker": worker.worker_id,
+                "pid": worker.process.pid if worker.process else None,
+                "alive": bool(worker.process and worker.process.is_alive()),
+                "restarts": worker.restarts,
+                **worker.status,
+            }
+            for worker in self._workers
+        ]
+
+    def _log_status(self) -> None:
+        for entry in self.status():
+            logger.info("워커 상태: %s", entry)
+
+    def _stop_all(self) -> None:
+        for worker in self._workers:
+            if worker.process and worker.process.is_alive():
+                worker.process.terminate()
+        for worker in self._workers:
+            if worker.process:
+                worker.process.join(timeout=15)
+                if worker.process.is_alive():
+                    worker.process.kill()
@@ -0,0 +1,113 @@
+﻿from __future__ import annotations
+
+import argparse
+import asyncio
+import statistics
+import threading
+import time
+from email.utils import formatdate
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from camping_bot.clock_sync import estimate_clock_offset, sleep_until
+
+
+class SkewedClockServer:
+    """Local server whose clock runs `skew_seconds` ahead of ours.
+
+    Every response carries a `Date` header from the skewed clock, and each hit
+    on /fire records its arrival time on that clock, so the error of an
+    opening-bell style fire can be measured against the server's notion of time.
+    """
+
+    def __init__(self, skew_seconds: float = 0.0) -> None:
+        self.skew_seconds = skew_seconds
+        self.fire_arrivals: list[float] = []
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def now(self) -> float:
+        return time.time() + self.skew_seconds
+
+    def start(self) -> SkewedClockServer:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> SkewedClockServer:
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def do_HEAD(self) -> None:  # noqa: N802
+                self._reply(b"")
+
+            def do_GET(self) -> None:  # noqa: N802
+                if self.path.startswith("/fire"):
+                    server.fire_arrivals.append(server.now())
+                self._reply(b"ok")
+
+            def _reply(self, body: bytes) -> None:
+                self.send_response(200)
+                self.send_header("Date", formatdate(server.now(), usegmt=True))
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(body)
+
+            def date_time_string(self, timestamp: float | None = None) -> str:
+                return formatdate(server.now() if timestamp is None else timestamp, usegmt=True)
+
+            def log_message(self, format: str, *args: object) -> None:
+                _ = (format, args)
+
+        return Handler
+
+
+async def measure_fire_error(skew_seconds: float, trials: int, samples: int) -> list[float]:
+    """Return per-trial fire errors in ms (positive = fired late by the server's clock)."""
+    errors = []
+    with SkewedClockServer(skew_seconds) as server:
+        async with httpx.AsyncClient() as client:
+            await client.get(f"{server.base_url}/warmup")
+            for _ in range(trials):
+                offset = await estimate_clock_offset(client, server.base_url, samples=samples)
+                target = float(int(server.now()) + 2)
+                await sleep_until(offset.to_local(target))
+                await client.get(f"{server.base_url}/fire")
+                errors.append((server.fire_arrivals[-1] - target) * 1000)
+    return errors
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Measure opening-bell fire-time error locally")
+    parser.add_argument("--skew", type=float, default=3.4, help="Server clock skew in seconds")
+    parser.add_argument("--trials", type=int, default=3)
+    parser.add_argument("--samples", type=int, default=8, help="Date-header samples per estimate")
+    args = parser.parse_args()
+
+    errors = asyncio.run(measure_fire_error(args.skew, args.trials, args.samples))
+    for idx, error in enumerate(errors, start=1):
+        print(f"trial {idx}: {error:+.1f} ms")
+    print(f"mean {statistics.mean(errors):+.1f} ms, max |err| {max(abs(e) for e in errors):.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+﻿from __future__ import annotations
+
+import html
+import random
+import secrets
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+_PAGE = """<!doctype html>
+<html lang="ko"><head><meta charset="utf-8"><title>{title}</title></head>
+<body>{body}</body></html>"""
+
+_POPUP = """<div class="popup" style="position:fixed;bottom:10px;right:10px;background:#fff;border:1px solid #000">
+  <p>공지사항</p><button class="popup-close" onclick="this.closest('.popup').style.display='none'">닫기</button>
+</div>"""
+
+
+@dataclass
+class FakeCampsiteOptions:
+    latency_ms: float = 30.0
+    jitter_ms: float = 10.0
+    available_ratio: float = 0.5
+    zones: tuple[str, ...] = ("A", "B")
+    sites_per_zone: int = 20
+    capacity: int = 6
+    captcha_code: str = "ABCD"
+    username: str = "bench"
+    password: str = "bench-pw"
+    seed: int | None = None
+
+
+@dataclass
+class FakeCampsiteStats:
+    requests: int = 0
+    logins: int = 0
+    searches: int = 0
+    reservations: list[dict[str, str]] = field(default_factory=list)
+
+
+class FakeCampsiteServer:
+    """Local stand-in for the Interpark goods/booking flow.
+
+    The DOM matches the selectors in cfg/targets.example.yaml: goods page with
+    popup, login link and schedule filters; a login form; a booking page with
+    the anti-bot input and the deck list; and the payment form. Every response
+    is delayed by `latency_ms` ± `jitter_ms`, and each booking page shows a
+    random `available_ratio` share of the decks.
+    """
+
+    def __init__(self, options: FakeCampsiteOptions | None = None) -> None:
+        self.options = options or FakeCampsiteOptions()
+        self.stats = FakeCampsiteStats()
+        self._rng = random.Random(self.options.seed)
+        self._sessions: set[str] = set()
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread: threading.Thread | None = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/goods"
+
+    def start(self) -> FakeCampsiteServer:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> FakeCampsiteServer:
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+    def site_names(self) -> list[str]:
+        return [
+            f"{zone}-{idx:02d}"
+            for zone in self.options.zones
+            for idx in range(1, self.options.sites_per_zone + 1)
+        ]
+
+    def _availability(self) -> list[tuple[str, bool]]:
+        with self._lock:
+            return [
+                (name, self._rng.random() < self.options.available_ratio)
+                for name in self.site_names()
+            ]
+
+    def _delay(self) -> None:
+        opts = self.options
+        with self._lock:
+            jitter = self._rng.uniform(-opts.jitter_ms, opts.jitter_ms)
+        time.sleep(max(0.0, opts.latency_ms + jitter) / 1000)
+
+    # pages -----------------------------------------------------------------
+
+    def _goods_page(self, logged_in: bool) -> str:
+        account = (
+            '<a href="/logout">로그아웃</a>' if logged_in else '<a href="/login">로그인</a>'
+        )
+        nights = "".join(f'<option value="{n}">{n}박</option>' for n in range(1, 4))
+        guests = "".join(f'<option value="{n}">{n}명</option>' for n in range(1, 9))
+        body = f"""{_POPUP}
+<header>{account}</header>
+<h1>안성맞춤캠핑장</h1>
+<form onsubmit="return false">
+  <input name="checkInDate" placeholder="YYYY-MM-DD">
+  <select name="nights">{nights}</select>
+  <select name="guests">{guests}</select>
+  <button type="button" onclick="document.getElementById('result').textContent='조회 완료'">조회</button>
+</form>
+<p id="result"></p>
+<button type="button" onclick="location.href='/booking?date='
+  + encodeURIComponent(document.querySelector('input[name=checkInDate]').value)
+  + '&nights=' + document.querySelector('select[name=nights]').value">예매하기</button>"""
+        return _PAGE.format(title="상품", body=body)
+
+    def _login_page(self) -> str:
+        body = """<form method="post" action="/login">
+  <input name="userId" id="userId" placeholder="아이디">
+  <input name="userPwd" id="userPwd" type="password">
+  <button type="submit">로그인</button>
+</form>"""
+        return _PAGE.format(title="로그인", body=body)
+
+    def _deck_row(self, name: str, available: bool) -> str:
+        safe = html.escape(name)
+        if available:
+            button = f"""<button type="button" onclick="location.href='/payment?site={safe}'">선택</button>"""
+        else:
+            button = '<button type="button" disabled>마감</button>'
+        css = "deck-item" if available else "deck-item sold-out"
+        return f"""<li class="{css}"><span class="deck-name">{safe}</span>
+  <span class="deck-zone">{html.escape(name.split('-')[0])}</span>
+  <span class="deck-capacity">{self.options.capacity}</span>
+  {button}</li>"""
+
+    def _booking_page(self, sites: list[tuple[str, bool]]) -> str:
+        rows = "".join(self._deck_row(name, available) for name, available in sites)
+        body = f"""{_POPUP}
+<div id="captcha-box">
+  <p>부정예매방지 문자를 입력하세요</p>
+  <input name="captcha">
+  <button type="button" onclick="if (document.querySelector('input[name=captcha]').value === '{self.options.captcha_code}') {{
+    document.getElementById('captcha-box').style.display = 'none';
+    document.getElementById('decks').style.display = 'block';
+  }}">확인</button>
+</div>
+<div id="decks" style="display:none"><ul class="deck-list">{rows}</ul></div>"""
+        return _PAGE.format(title="예매", body=body)
+
+    def _payment_page(self, site: str) -> str:
+        body = f"""<form method="post" action="/reserve">
+  <input type="hidden" name="site" value="{html.escape(site)}">
+  <select name="discount"><option value="NONE">할인 없음</option><option value="LOCAL">지역 할인</option></select>
+  <input name="birth"><input name="carNo">
+  <label><input type="radio" name="payMethod" value="BANK_TRANSFER">무통장입금</label>
+  <select name="bankCode"><option value="BANK_004">국민</option><option value="BANK_088">신한</option></select>
+  <label><input type="checkbox" id="agreeAll" name="agree" value="Y">전체 동의</label>
+  <button type="submit">결제하기</button>
+</form>"""
+        return _PAGE.format(title="결제", body=body)
+
+    # http ------------------------------------------------------------------
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        site = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self) -> None:  # noqa: N802
+                site._delay()
+                site.stats.requests += 1
+                url = urlsplit(self.path)
+                query = parse_qs(url.query)
+                logged_in = self._session() in site._sessions
+
+                if url.path in ("/", "/goods"):
+                    self._html(site._goods_page(logged_in))
+                elif url.path == "/login":
+                    self._html(site._login_page())
+                elif url.path == "/logout":
+                    site._sessions.discard(self._session())
+                    self._redirect("/goods")
+                elif url.path == "/booking":
+                    if not logged_in:
+                        self._redirect("/login")
+                        return
+                    site.stats.searches += 1
+                    self._html(site._booking_page(site._availability()))
+                elif url.path == "/payment":
+                    self._html(site._payment_page(query.get("site", [""])[0]))
+                elif url.path == "/done":
+                    self._html(_PAGE.format(title="완료", body="<p>예약 완료</p>"))
+                else:
+                    self.send_error(404)
+
+            def do_POST(self) -> None:  # noqa: N802
+                site._delay()
+                site.stats.requests += 1
+                length = int(self.headers.get("Content-Length", "0"))
+                form = {
+                    key: values[0]
+                    for key, values in parse_qs(self.rfile.read(length).decode("utf-8")).items()
+                }
+                path = urlsplit(self.path).path
+                if path == "/login":
+                    if (
+                        form.get("userId") == site.options.username
+                        and form.get("userPwd") == site.options.password
+                    ):
+                        sid = secrets.token_hex(8)
+                        site._sessions.add(sid)
+                        site.stats.logins += 1
+                        self._redirect("/goods", cookie=f"sid={sid}; Path=/")
+                    else:
+                        self._redirect("/login")
+                elif path == "/reserve":
+                    site.stats.reservations.append(form)
+                    self._redirect("/done")
+                else:
+                    self.send_error(404)
+
+            def _session(self) -> str:
+                for part in self.headers.get("Cookie", "").split(";"):
+                    name, _, value = part.strip().partition("=")
+                    if name == "sid":
+                        return value
+                return ""
+
+            def _html(self, text: str) -> None:
+                data = text.encode("utf-8")
+                self.send_response(200)
+                self.send_header("Content-Type", "text/html; charset=utf-8")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _redirect(self, location: str, cookie: str | None = None) -> None:
+                self.send_response(303)
+                self.send_header("Location", location)
+                if cookie:
+                    self.send_header("Set-Cookie", cookie)
+                self.send_header("Content-Length", "0")
+                self.end_headers()
+
+            def log_message(self, format: str, *args: object) -> None:
+                _ = (format, args)
+
+        return Handler
@@ -0,0 +1,80 @@
+﻿from __future__ import annotations
+
+import json
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class FakeTelegramServer:
+    """Local stand-in for api.telegram.org's sendMessage.
+
+    Point TELEGRAM_API_BASE at `api_base`. The first `fail_with_429` requests
+    answer 429 with `retry_after` so retry/backoff paths can be exercised.
+    """
+
+    def __init__(self, fail_with_429: int = 0, retry_after: float = 0.1) -> None:
+        self.messages: list[dict] = []
+        self.requests = 0
+        self._fail_with_429 = fail_with_429
+        self._retry_after = retry_after
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), self._handler())
+        self._thread: threading.Thread | None = None
+
+    @property
+    def api_base(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> FakeTelegramServer:
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self) -> FakeTelegramServer:
+        return self.start()
+
+    def __exit__(self, *exc: object) -> None:
+        self.stop()
+
+    def _handler(self) -> type[BaseHTTPRequestHandler]:
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self) -> None:  # noqa: N802
+                length = int(self.headers.get("Content-Length", "0"))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                with fake._lock:
+                    fake.requests += 1
+                    throttled = fake.requests <= fake._fail_with_429
+                    if not throttled and self.path.endswith("/sendMessage"):
+                        fake.messages.append(body)
+
+                if throttled:
+                    self._reply(
+                        429,
+                        {
+                            "ok": False,
+                            "error_code": 429,
+                            "parameters": {"retry_after": fake._retry_after},
+                        },
+                    )
+                    return
+                self._reply(200, {"ok": True, "result": {"text": body.get("text", "")}})
+
+            def _reply(self, status: int, payload: dict) -> None:
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            def log_message(self, format: str, *args: object) -> None:
+                _ = (format, args)
+
+        return Handler
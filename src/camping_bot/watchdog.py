@@ -0,0 +1,72 @@
+﻿from __future__ import annotations
+
+import asyncio
+import logging
+import sys
+import threading
+import time
+import traceback
+
+from camping_bot.metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+
+class LoopWatchdog:
+    """Detect event-loop stalls from a side thread.
+
+    The loop bumps a heartbeat every `interval_seconds`; the thread reports a
+    stall when the heartbeat is older than `stall_seconds`, logging the loop
+    thread's current stack so the blocking call can be found. Lag is exported
+    as camping_bot_event_loop_lag_seconds.
+    """
+
+    def __init__(self, metrics: Metrics, stall_seconds: float, interval_seconds: float = 0.25) -> None:
+        self.metrics = metrics
+        self._stall = stall_seconds
+        self._interval = interval_seconds
+        self._heartbeat = time.monotonic()
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._loop_thread_id: int | None = None
+        self._handle: asyncio.TimerHandle | None = None
+        self._stop = threading.Event()
+        self._thread: threading.Thread | None = None
+
+    def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._loop_thread_id = threading.get_ident()
+        self._beat()
+        self._thread = threading.Thread(target=self._watch, name="loop-watchdog", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._handle is not None:
+            self._handle.cancel()
+            self._handle = None
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+
+    def _beat(self) -> None:
+        now = time.monotonic()
+        lag = max(0.0, now - self._heartbeat - self._interval)
+        self._heartbeat = now
+        self.metrics.gauge("camping_bot_event_loop_lag_seconds", lag)
+        assert self._loop is not None
+        self._handle = self._loop.call_later(self._interval, self._beat)
+
+    def _watch(self) -> None:
+        reported = False
+        while not self._stop.wait(self._interval):
+            stalled_for = time.monotonic() - self._heartbeat
+            if stalled_for < self._stall:
+                reported = False
+                continue
+            if reported:
+                continue
+            reported = True
+            self.metrics.inc("camping_bot_event_loop_stalls_total")
+            frame = sys._current_frames().get(self._loop_thread_id or 0)
+            stack = "".join(traceback.format_stack(frame)) if frame else "(no frame)"
+            logger.warning("이벤트 루프 %.1f초 멈춤, 현재 위치:\n%s", stalled_for, stack)
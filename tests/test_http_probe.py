@@ -0,0 +1,82 @@
+﻿from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import Iterator
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import httpx
+
+from camping_bot.adapters.interpark_anseong_adapter import InterparkAnseongAdapter
+from camping_bot.plan import compile_plan
+
+_BODIES = {
+    "/open": (200, '{"remainSeat": 3}'),
+    "/full": (200, '{"remainSeat": 0}'),
+    "/blocked": (403, "forbidden"),
+    "/down": (503, "maintenance"),
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:  # noqa: N802
+        status, body = _BODIES.get(self.path.split("?")[0], (404, "not found"))
+        data = body.encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+    def log_message(self, format: str, *args: object) -> None:
+        _ = (format, args)
+
+
+@contextmanager
+def _stub_site() -> Iterator[str]:
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    try:
+        host, port = server.server_address[:2]
+        yield f"http://{host}:{port}"
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def _probe(base_url: str, path: str) -> bool | None:
+    plan = compile_plan(
+        {
+            "check_in": "2026-05-16",
+            "probe": {
+                "url": "{base_url}" + path + "?date={check_in}&nights={nights}",
+                "available_pattern": r'"remainSeat"\s*:\s*[1-9]',
+            },
+            "selectors": {
+                "site_item": ".deck",
+                "site_select_button": "button",
+                "submit_reservation_button": "#submit",
+            },
+        },
+        InterparkAnseongAdapter,
+    )
+
+    async def run() -> bool | None:
+        async with httpx.AsyncClient(timeout=5) as client:
+            return await InterparkAnseongAdapter.probe_availability(client, base_url, plan)
+
+    return asyncio.run(run())
+
+
+def test_probe_reports_availability() -> None:
+    with _stub_site() as base_url:
+        assert _probe(base_url, "/open") is True
+        assert _probe(base_url, "/full") is False
+
+
+def test_probe_http_error_escalates_to_browser() -> None:
+    with _stub_site() as base_url:
+        assert _probe(base_url, "/blocked") is None
+        assert _probe(base_url, "/down") is None
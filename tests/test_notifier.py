@@ -0,0 +1,90 @@
+﻿from __future__ import annotations
+
+import asyncio
+
+from camping_bot.models import RuntimeConfig
+from camping_bot.notifier import Notifier
+from camping_bot.testing.fake_telegram import FakeTelegramServer
+
+
+def _runtime(api_base: str, dedup_seconds: float = 600.0, batch_seconds: float = 0.0) -> RuntimeConfig:
+    return RuntimeConfig(
+        dry_run=True,
+        headless=True,
+        timeout_ms=1000,
+        captcha_mode="fixed",
+        storage_state_path=None,
+        telegram_bot_token="token",
+        telegram_chat_id="chat",
+        telegram_api_base=api_base,
+        notify_dedup_seconds=dedup_seconds,
+        notify_batch_seconds=batch_seconds,
+    )
+
+
+def _texts(server: FakeTelegramServer) -> list[str]:
+    return [message["text"] for message in server.messages]
+
+
+def test_retries_after_429() -> None:
+    async def scenario(server: FakeTelegramServer) -> None:
+        notifier = Notifier(_runtime(server.api_base))
+        await notifier.send("[job] 새 자리 1개: A-12")
+        await notifier.close()
+
+    with FakeTelegramServer(fail_with_429=2, retry_after=0.05) as server:
+        asyncio.run(scenario(server))
+
+    assert server.requests == 3
+    assert _texts(server) == ["[job] 새 자리 1개: A-12"]
+
+
+def test_batches_burst_into_one_message() -> None:
+    async def scenario(server: FakeTelegramServer) -> None:
+        notifier = Notifier(_runtime(server.api_base, batch_seconds=0.2))
+        await notifier.send("first")
+        await notifier.send("second")
+        await notifier.send("third")
+        await notifier.close()
+
+    with FakeTelegramServer() as server:
+        asyncio.run(scenario(server))
+
+    assert _texts(server) == ["first\nsecond\nthird"]
+
+
+def test_dedup_only_coalesces_marked_messages() -> None:
+    async def scenario(server: FakeTelegramServer) -> None:
+        notifier = Notifier(_runtime(server.api_base))
+        for _ in range(3):
+            await notifier.send("[job] 오류: timeout", coalesce=True)
+            # a slot that disappears and comes back must be reported every time
+            await notifier.send("[job] 새 자리 1개: A-12")
+            await asyncio.sleep(0.05)
+        await notifier.close()
+
+    with FakeTelegramServer() as server:
+        asyncio.run(scenario(server))
+
+    texts = "\n".join(_texts(server)).splitlines()
+    assert texts.count("[job] 오류: timeout") == 1
+    assert texts.count("[job] 새 자리 1개: A-12") == 3
+
+
+def test_suppressed_repeats_are_counted_after_window() -> None:
+    async def scenario(server: FakeTelegramServer) -> None:
+        notifier = Notifier(_runtime(server.api_base, dedup_seconds=0.2))
+        await notifier.send("[job] 오류: timeout", coalesce=True)
+        await notifier.send("[job] 오류: timeout", coalesce=True)
+        await notifier.send("[job] 오류: timeout", coalesce=True)
+        await asyncio.sleep(0.3)
+        await notifier.send("[job] 오류: timeout", coalesce=True)
+        await notifier.close()
+
+    with FakeTelegramServer() as server:
+        asyncio.run(scenario(server))
+
+    assert _texts(server) == [
+        "[job] 오류: timeout",
+        "[job] 오류: timeout (직전 2회 반복 생략)",
+    ]